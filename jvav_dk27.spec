@@ -4,7 +4,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('assets/logo.ico', 'assets')],
-    hiddenimports=['urllib', 'urllib.request', 'urllib.parse', 'subprocess', 'json', 'datetime', 'math', 'random', 'pathlib', 'collections', 'itertools', 'functools', 'operator', 'statistics', 'string', 're', 'base64', 'hashlib', 'argparse', 'time', 'platform', 'inspect'],
+    hiddenimports=['urllib', 'urllib.request', 'urllib.parse', 'subprocess', 'json', 'datetime', 'math', 'random', 'pathlib', 'collections', 'itertools', 'functools', 'operator', 'statistics', 'string', 're', 'tokenize', 'base64', 'hashlib', 'marshal', 'importlib.util', 'argparse', 'time', 'platform', 'inspect', 'threading', 'sqlite3', 'pickle', 'http.server', 'queue'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
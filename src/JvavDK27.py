@@ -23,6 +23,10 @@ CLI usage
 - Self-check: python JvavDK27.py info
 """
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 import ast
 import sys
 import os
@@ -36,30 +40,63 @@ if sys.platform == 'win32':
     if sys.stderr.encoding != 'utf-8':
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+import copy
 import json
-import hashlib
+import marshal
+import importlib
+import importlib.util
 import argparse
-import time
 import collections
 import itertools
 import functools
 import operator
-import statistics
-import string
 import re
-import base64
-import urllib.parse
-import urllib.request
-import subprocess
-import platform
+import tokenize
 import random
 import math
-import inspect
-from typing import Any, Dict, List, Optional, Callable, Union
+# Heavy modules (urllib.request, subprocess, statistics, inspect, hashlib,
+# base64, sqlite3, http.server) are imported on first use by the helper,
+# plugin or command that needs them.
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Callable, TextIO, Union
 from pathlib import Path
+from types import CodeType, MappingProxyType
 from datetime import datetime, date, timedelta
 from collections import Counter, deque, defaultdict, OrderedDict, namedtuple
 
+# Start-up phases in milliseconds, reported by `info --startup`
+STARTUP_TIMINGS: Dict[str, float] = {"import": (time.perf_counter() - _IMPORT_STARTED) * 1000}
+
+JVAV_VERSION = "DK27 v6"
+
+# Package index written by jvavpkg into each packages root (see jvavpkg.py)
+PACKAGE_INDEX_FILE = "index.json"
+PACKAGE_INDEX_VERSION = 1
+
+# Compiled .jvav sources are cached next to the script, like __pycache__
+JVAVCACHE_DIR = "__jvavcache__"
+# Bumped whenever the layout of a cached entry changes
+JVAVCACHE_FORMAT = 9
+
+# Hidden env name that import statements in .jvav files are compiled into calls of
+IMPORT_HOOK = "__jvav_import__"
+# Hidden env name of the runtime helper behind -OO loop-invariant hoisting
+HOIST_HOOK = "__jvav_hoist__"
+# Hidden env name of the decorator --memoize-pure puts on top-level functions
+MEMOIZE_HOOK = "__jvav_memoize__"
+# Hidden env name of the decorator -O puts on top-level functions whose body
+# relies on helpers staying unshadowed (recompiled once one is shadowed)
+OPTIMIZED_HOOK = "__jvav_optimized__"
+# Hidden env name eval_many routes top-level expression statements through
+ECHO_HOOK = "__jvav_echo__"
+# Hidden env names used by --safe-methods calls: the guarded call, the table of
+# exact types each method is called on directly, and type()
+METHOD_HOOK = "__jvav_method__"
+METHODS_HOOK = "__jvav_methods__"
+TYPE_HOOK = "__jvav_type__"
+# Hidden env name of the check a loop-rewritten tail call makes before looping:
+# is the function's global name still bound to the running function?
+TAIL_HOOK = "__jvav_tail__"
+
 # JVAV reversed keywords → Python (whole-word only; no 'file'→'elif', too common in strings)
 KW_MAP = [
     ('esle', 'else'),
@@ -73,25 +110,1746 @@ KW_MAP = [
     ('nruter', 'return'),
 ]
 
+# --deep-recursion: default worker thread stack, and the C stack budgeted per
+# Python frame when deriving the matching recursion limit
+DEEP_RECURSION_STACK_MB = 512
+_STACK_BYTES_PER_FRAME = 2048
+
+# --memoize-pure: results kept per memoized function (LRU eviction)
+MEMOIZE_SIZE = 4096
+
+# ehcacksid: persistent memo store (override with JVAV_MEMO_DB), default
+# number of results kept per function and total rows kept in the store
+# (least recently used are evicted, whichever function they belong to)
+DISK_MEMO_PATH = Path.home() / ".jvav" / "memo.sqlite3"
+DISK_MEMO_SIZE = 10000
+DISK_MEMO_TOTAL_SIZE = 200000
+
+# --stream: top-level statements are compiled together until they reach this
+# many characters (one larger statement is compiled on its own)
+STREAM_BATCH_SIZE = 64 * 1024
+
+# jvav serve: default port and pool size, jobs an evaluator runs before it is
+# replaced by a fresh one, and the largest accepted request body
+SERVE_PORT = 8727
+SERVE_WORKERS = 4
+SERVE_RECYCLE_AFTER = 1000
+SERVE_MAX_BODY = 16 * 1024 * 1024
+
+# Maximum number of compiled statements kept per evaluator (LRU eviction)
+CODE_CACHE_SIZE = 1024
+# Compiled -c / REPL-block / run_source programs shared by all evaluators
+PROGRAM_CACHE_SIZE = 1024
+# Validation verdicts shared by all evaluators, keyed by (mode, options, source text)
+VALIDATION_MEMO_SIZE = 4096
+
+
+_KW_TABLE: Dict[str, str] = dict(KW_MAP)
+# First words of clauses that continue the statement above them (--stream)
+_CONTINUATION_KEYWORDS = frozenset({"else", "elif", "except", "finally"}) | {
+    jvav for jvav, python in KW_MAP if python in ("else", "elif", "except", "finally")
+}
+# Fallback for sources the tokenizer rejects: one alternation, one pass per line
+_KW_PATTERN = re.compile(r'\b(?:' + '|'.join(re.escape(k) for k, _ in KW_MAP) + r')\b')
+
+
+def _translate_keywords(lines: list[str]) -> list[str]:
+    """Rewrite reversed keywords in NAME tokens only; strings and comments are left alone."""
+    if not any(_KW_PATTERN.search(line) for line in lines):
+        return lines
+    edits: Dict[int, List[tuple]] = {}
+    try:
+        readline = iter([line + '\n' for line in lines]).__next__
+        for tok in tokenize.generate_tokens(readline):
+            if tok.type == tokenize.NAME and tok.string in _KW_TABLE:
+                edits.setdefault(tok.start[0], []).append((tok.start[1], tok.string))
+    except (tokenize.TokenError, SyntaxError):
+        return [_KW_PATTERN.sub(lambda m: _KW_TABLE[m.group(0)], line) for line in lines]
+    result = list(lines)
+    for row, hits in edits.items():
+        line = result[row - 1]
+        for col, jvav_kw in reversed(hits):
+            line = line[:col] + _KW_TABLE[jvav_kw] + line[col + len(jvav_kw):]
+        result[row - 1] = line
+    return result
+
+
+def _split_statements(source: str) -> list[str]:
+    """Split one line on top-level ';' (string literals and brackets are respected)."""
+    pieces: list[str] = []
+    depth = 0
+    start = 0
+    try:
+        for tok in tokenize.generate_tokens(iter([source]).__next__):
+            if tok.type != tokenize.OP:
+                continue
+            if tok.string in '([{':
+                depth += 1
+            elif tok.string in ')]}':
+                depth -= 1
+            elif tok.string == ';' and depth == 0:
+                pieces.append(source[start:tok.start[1]])
+                start = tok.end[1]
+    except (tokenize.TokenError, SyntaxError):
+        return [source]
+    pieces.append(source[start:])
+    return [piece for piece in pieces if piece.strip()]
+
 
 def _preprocess_lines(lines: list[str]) -> list[str]:
     """Translate JVAV keywords, filter comments and blank lines."""
-    result: list[str] = []
+    kept: list[str] = []
     for line in lines:
         stripped = line.rstrip('\n')
         if not stripped.strip() or stripped.lstrip().startswith('#'):
             continue
-        for jvav_kw, py_kw in KW_MAP:
-            stripped = re.sub(r'\b' + jvav_kw + r'\b', py_kw, stripped)
-        result.append(stripped)
-    return result
+        kept.append(stripped)
+    return _translate_keywords(kept)
+
+
+def _echo_statements(tree: ast.Module) -> ast.Module:
+    """Pass the value of every top-level expression statement to the echo hook."""
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Expr):
+            hook = ast.copy_location(ast.Name(ECHO_HOOK, ast.Load()), stmt.value)
+            stmt.value = ast.copy_location(ast.Call(hook, [stmt.value], []), stmt.value)
+    return tree
+
+
+# --stream: what decides whether a line ends a logical line: comments, a
+# trailing backslash, string literals (triple quotes open multi-line ones)
+# and brackets
+_SCAN_TOKENS = re.compile(r"""#|\\$|'''|\"\"\"|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[()\[\]{}]""")
+_TRIPLE_QUOTE_ENDS = {quote: re.compile(r"(?:[^\\]|\\.)*?" + quote, re.S) for quote in ("'''", '"""')}
+_FIRST_WORD = re.compile(r"[A-Za-z_]\w*")
+
+
+def _scan_line(line: str, depth: int, quote: Optional[str]) -> tuple:
+    """Bracket depth, open triple quote and backslash continuation after ``line``."""
+    pos = 0
+    if quote is not None:
+        end = _TRIPLE_QUOTE_ENDS[quote].match(line)
+        if end is None:
+            return depth, quote, False
+        pos = end.end()
+    while True:
+        match = _SCAN_TOKENS.search(line, pos)
+        if match is None:
+            return depth, None, False
+        token, pos = match.group(), match.end()
+        if token == "#":
+            return depth, None, False
+        if token == "\\":
+            return depth, None, True
+        if token in _TRIPLE_QUOTE_ENDS:
+            end = _TRIPLE_QUOTE_ENDS[token].match(line, pos)
+            if end is None:
+                return depth, token, False
+            pos = end.end()
+        elif token in "([{":
+            depth += 1
+        elif token in ")]}":
+            depth -= 1
+
+
+def _top_level_statements(lines: Iterable[str]) -> Iterator[tuple]:
+    """Split an iterator of source lines into complete top-level statements.
+
+    Yields ``(first_line_number, source)`` as soon as the next top-level
+    statement starts, so only one statement is held at a time. Clauses
+    such as ``esle``/``tpecxe``/``finally`` stay with their block, and
+    decorators with their def. Comments and blank lines before a statement
+    are yielded with the one above it.
+    """
+    held: List[str] = []
+    first = 1  # line number of held[0]
+    depth, quote, continued = 0, None, False
+    started = decorated = False
+    for row, line in enumerate(lines, 1):
+        if depth <= 0 and quote is None and not continued and line[:1] not in ("", " ", "\t", "\n", "\r", "#"):
+            word = _FIRST_WORD.match(line)
+            if started and not decorated and not (word and word.group() in _CONTINUATION_KEYWORDS):
+                yield first, "".join(held)
+                held = []
+                first = row
+            started = True
+            decorated = line.startswith("@")
+        held.append(line)
+        depth, quote, continued = _scan_line(line.rstrip("\r\n"), depth, quote)
+    if "".join(held).strip():
+        yield first, "".join(held)
+
+
+def _jvavcache_path(src_path: Path) -> Path:
+    """Location of the cached code object for a .jvav (or .jvavpkg) source file."""
+    return src_path.parent / JVAVCACHE_DIR / f"{src_path.name}.{sys.implementation.cache_tag}.jvavc"
+
+
+def _jvavcache_key(source: str, filename: str, options: tuple = ()) -> bytes:
+    """Cache header: Python bytecode magic + hash of source, KW_MAP, interpreter, cache format and compile options."""
+    import hashlib
+    digest = hashlib.sha256()
+    for part in (JVAV_VERSION, str(JVAVCACHE_FORMAT), repr(KW_MAP), repr(options), filename, source):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return importlib.util.MAGIC_NUMBER + digest.digest()
+
+
+def _read_jvavcache(cache_path: Path, key: bytes) -> Optional[Any]:
+    """Return the cached ``(code, bound_names, assumed)`` entry if its header matches ``key``."""
+    try:
+        data = cache_path.read_bytes()
+    except OSError:
+        return None
+    if not data.startswith(key):
+        return None
+    try:
+        return marshal.loads(data[len(key):])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_jvavcache(cache_path: Path, key: bytes, entry: Any) -> None:
+    """Atomically store a validated ``(code, bound_names, assumed)`` entry; unwritable locations are skipped."""
+    if os.environ.get("JVAV_DONT_WRITE_CACHE"):
+        return
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(key + marshal.dumps(entry))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+class _BoundNames(ast.NodeVisitor):
+    """Collect names a module binds at its own top level (defs, classes, store targets).
+
+    Function and class bodies are not entered: their names are local.
+    """
+
+    def __init__(self) -> None:
+        self.names: Dict[str, None] = {}
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, (ast.Store, ast.Del)):
+            self.names[node.id] = None
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        pass  # skips NodeVisitor's slow legacy visit_Num/visit_Str dispatch
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self.names[node.name] = None
+        for child in node.decorator_list + node.args.defaults + node.args.kw_defaults:
+            if child is not None:
+                self.visit(child)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.names[node.name] = None
+        for child in node.decorator_list + node.bases:
+            self.visit(child)
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        for child in node.args.defaults:
+            self.visit(child)
+
+    def visit_comprehension(self, node: ast.comprehension) -> None:
+        # The comprehension target is local; only walrus targets escape
+        self.visit(node.iter)
+        for cond in node.ifs:
+            self.visit(cond)
+
+    def visit_alias(self, node: ast.alias) -> None:
+        self.names[(node.asname or node.name).split(".")[0]] = None
+
+
+def _bound_names(tree: ast.AST) -> tuple:
+    """Top-level names bound by ``tree``, in first-binding order."""
+    collector = _BoundNames()
+    collector.visit(tree)
+    return tuple(collector.names)
+
+
+def _rewrite_imports(tree: ast.Module) -> ast.Module:
+    """Turn top-level ``import``/``from ... import`` into calls of the import hook.
+
+    ``import foo`` becomes ``foo = __jvav_import__('foo')`` and
+    ``from foo import a, b as c`` becomes
+    ``(a, c) = __jvav_import__('foo', ('a', 'b'))``.
+    """
+    if not any(isinstance(stmt, (ast.Import, ast.ImportFrom)) for stmt in tree.body):
+        return tree
+    body: list = []
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Import):
+            for alias in stmt.names:
+                call = ast.Call(ast.Name(IMPORT_HOOK, ast.Load()), [ast.Constant(alias.name)], [])
+                target = ast.Name(alias.asname or alias.name, ast.Store())
+                body.append(ast.copy_location(ast.Assign([target], call), stmt))
+        elif isinstance(stmt, ast.ImportFrom):
+            names = tuple(alias.name for alias in stmt.names)
+            call = ast.Call(ast.Name(IMPORT_HOOK, ast.Load()),
+                            [ast.Constant(stmt.module), ast.Constant(names)], [])
+            targets = [ast.Name(alias.asname or alias.name, ast.Store()) for alias in stmt.names]
+            body.append(ast.copy_location(ast.Assign([ast.Tuple(targets, ast.Store())], call), stmt))
+        else:
+            body.append(stmt)
+    tree.body = body
+    return ast.fix_missing_locations(tree)
+
+
+def _eliminate_tail_calls(tree: ast.Module) -> ast.Module:
+    """Turn self tail calls of top-level functions into loops, so they run in constant stack.
+
+    ``nruter f(a, b)`` in ``f`` (also inside ``if`` branches and conditional
+    expressions) becomes ``(p1, p2) = (a, b)`` plus ``continue`` in a
+    ``while True`` around the body, guarded by __jvav_tail__: once ``f`` is
+    rebound (``g = f`` and a new ``def f``), the old function makes the
+    real call again. Only undecorated functions with plain positional
+    parameters whose name the code binds once are rewritten; sites inside
+    loops, ``try`` or ``with`` stay ordinary calls.
+    """
+    if not any(isinstance(stmt, ast.FunctionDef) for stmt in tree.body):
+        return tree
+    bindings = Counter(node.id for node in ast.walk(tree)
+                       if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load))
+    bindings.update(node.name for node in ast.walk(tree)
+                    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)))
+    for stmt in tree.body:
+        if isinstance(stmt, ast.FunctionDef) and bindings[stmt.name] == 1:
+            _loop_tail_calls(stmt)
+    return ast.fix_missing_locations(tree)
+
+
+def _loop_tail_calls(func: ast.FunctionDef) -> None:
+    """Rewrite ``func``'s self tail calls in place (see _eliminate_tail_calls)."""
+    args = func.args
+    if func.decorator_list or args.posonlyargs or args.vararg or args.kwonlyargs or args.kwarg:
+        return
+    for stmt in func.body:
+        for node in ast.walk(stmt):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda,
+                                 ast.Yield, ast.YieldFrom, ast.Await, ast.Global, ast.Nonlocal)):
+                return  # closures/generators would observe the reassigned parameters
+    params = [arg.arg for arg in args.args]
+    found = []
+
+    def is_tail_call(expr: Optional[ast.AST]) -> bool:
+        return (isinstance(expr, ast.Call) and isinstance(expr.func, ast.Name) and expr.func.id == func.name
+                and not expr.keywords and len(expr.args) == len(params)
+                and not any(isinstance(arg, ast.Starred) for arg in expr.args))
+
+    def has_tail_call(expr: Optional[ast.AST]) -> bool:
+        if isinstance(expr, ast.IfExp):
+            return has_tail_call(expr.body) or has_tail_call(expr.orelse)
+        return is_tail_call(expr)
+
+    def rewrite_return(ret: ast.Return) -> list:
+        value = ret.value
+        if is_tail_call(value):
+            found.append(value)
+            stmts: list = []
+            if len(params) == 1:
+                stmts.append(ast.Assign([ast.Name(params[0], ast.Store())], value.args[0]))
+            elif params:
+                stmts.append(ast.Assign([ast.Tuple([ast.Name(p, ast.Store()) for p in params], ast.Store())],
+                                        ast.Tuple(value.args, ast.Load())))
+            stmts.append(ast.Continue())
+            running = ast.Call(ast.Name(TAIL_HOOK, ast.Load()), [ast.Name(func.name, ast.Load())], [])
+            guarded = ast.If(running, [ast.copy_location(stmt, ret) for stmt in stmts], [ret])
+            return [ast.copy_location(guarded, ret)]
+        if isinstance(value, ast.IfExp) and has_tail_call(value):
+            branch = ast.If(value.test,
+                            rewrite_return(ast.copy_location(ast.Return(value.body), ret)),
+                            rewrite_return(ast.copy_location(ast.Return(value.orelse), ret)))
+            return [ast.copy_location(branch, ret)]
+        return [ret]
+
+    def rewrite_block(stmts: list) -> list:
+        out: list = []
+        for stmt in stmts:
+            if isinstance(stmt, ast.Return):
+                out.extend(rewrite_return(stmt))
+                continue
+            if isinstance(stmt, ast.If):
+                stmt.body = rewrite_block(stmt.body)
+                stmt.orelse = rewrite_block(stmt.orelse)
+            out.append(stmt)
+        return out
+
+    body = func.body
+    docstring = body[:1] if (isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+                             and isinstance(body[0].value.value, str)) else []
+    new_body = rewrite_block(body[len(docstring):])
+    if not found:
+        return
+    end = ast.copy_location(ast.Return(ast.Constant(None)), body[-1])
+    loop = ast.copy_location(ast.While(ast.Constant(True), new_body + [end], []), body[len(docstring)])
+    func.body = docstring + [loop]
+
+
+def _is_running(func: Any) -> bool:
+    """Whether ``func`` is the function whose frame called this (installed as __jvav_tail__).
+
+    Also sees through the --memoize-pure wrapper, so memoized functions keep
+    looping as before.
+    """
+    code = getattr(func, '__code__', None)
+    if code is None:
+        code = getattr(getattr(func, '__wrapped__', None), '__code__', None)
+    return code is sys._getframe(1).f_code
+
+
+# -O: reversed helpers that are thin lambdas/operators over their arguments,
+# by arity, and the direct operation each call is rewritten into. ``_N`` is
+# the N-th argument; every argument is used exactly once. Helpers with extra
+# checks (teg, pop_, syek, ...) or that name a Python builtin are left alone.
+_INLINE_TEMPLATES: Dict[str, Dict[int, str]] = {
+    "dneppa": {2: "_0.append(_1)"},
+    "dnetxe": {2: "_0.extend(_1)"},
+    "tresni": {3: "_0.insert(_1, _2)"},
+    "evormer": {2: "_0.remove(_1)"},
+    "pop": {1: "_0.pop(-1)", 2: "_0.pop(_1)"},
+    "raelc": {1: "_0.clear()"},
+    "teseR": {1: "_0.clear()"},
+    "ypoC": {1: "_0.copy()"},
+    "tros": {1: "_0.sort(key=None, reverse=False)", 2: "_0.sort(key=_1, reverse=False)",
+             3: "_0.sort(key=_1, reverse=_2)"},
+    "esrever": {1: "_0.reverse()"},
+    "tnuoc": {2: "_0.count(_1)"},
+    "tup": {3: "_0.__setitem__(_1, _2)"},
+    "etupda": {2: "_0.update(_1)"},
+    "tnemtupni": {2: "{_0: _1}"},
+    "dom": {2: "_0 % _1"},
+    "gniht_": {2: "_0 + _1"},
+    "evresid": {2: "_0 - _1"},
+    "eitivlum": {2: "_0 * _1"},
+    "edivid": {2: "_0 / _1"},
+    "floof_": {2: "_0 // _1"},
+    "eq": {2: "_0 == _1"},
+    "en": {2: "_0 != _1"},
+    "tl": {2: "_0 < _1"},
+    "et": {2: "_0 <= _1"},
+    "tg": {2: "_0 > _1"},
+    "eg": {2: "_0 >= _1"},
+    "tlihs": {1: "_0.split(None)", 2: "_0.split(_1)"},
+    "egakcorP_": {1: "_0.rsplit(None)", 2: "_0.rsplit(_1)"},
+    "pirts": {1: "_0.strip()"},
+    "tfel_pirts": {1: "_0.lstrip()"},
+    "thgir_pirts": {1: "_0.rstrip()"},
+    "reppu": {1: "_0.upper()"},
+    "rewol": {1: "_0.lower()"},
+    "epac_": {1: "_0.capitalize()"},
+    "esilcaeltwit": {1: "_0.title()"},
+    "swapS": {1: "_0.swapcase()"},
+    "ecalper": {3: "_0.replace(_1, _2)"},
+    "dnif": {2: "_0.find(_1)"},
+    "fni": {2: "_1 in _0"},
+    "niatsnoC": {2: "_1 in _0"},
+    "strats_": {2: "_0.startswith(_1)"},
+    "sdn_": {2: "_0.endswith(_1)"},
+    "esrever_": {1: "_0[::-1]"},
+    "dap": {2: "_0.ljust(_1, ' ')", 3: "_0.ljust(_1, _2)"},
+    "redneC": {2: "_0.center(_1)"},
+    "si_": {2: "_0 is _1"},
+    "ton_si": {2: "_0 is not _1"},
+    "tfel_tfihs": {2: "_0 << _1"},
+    "thgir_tfihs": {2: "_0 >> _1"},
+    "dna_": {2: "_0 & _1"},
+    "ro_": {2: "_0 | _1"},
+    "xor_": {2: "_0 ^ _1"},
+    "etageltsbI": {1: "_0.bit_length()"},
+    "ecilS": {3: "_0[_1:_2:1]", 4: "_0[_1:_2:_3]"},
+}
+
+
+def _all_bound_names(tree: ast.AST) -> set:
+    """Every name bound anywhere in ``tree`` (any scope): such names shadow helpers."""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.alias):
+            names.add(node.asname or node.name)
+    return names
+
+
+class _HelperInliner(ast.NodeTransformer):
+    """Rewrite calls of the helpers in _INLINE_TEMPLATES into the operation itself.
+
+    Runs on validated trees only, so the attribute access it introduces is
+    limited to the fixed method names of the templates.
+    """
+
+    def __init__(self, excluded: set) -> None:
+        self.excluded = excluded
+        self.inlined: Dict[str, None] = {}
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        func = node.func
+        if not isinstance(func, ast.Name) or func.id in self.excluded or node.keywords:
+            return node
+        template = _INLINE_TEMPLATES.get(func.id, {}).get(len(node.args))
+        if template is None or any(isinstance(arg, ast.Starred) for arg in node.args):
+            return node
+        order = [int(n) for n in re.findall(r"\b_(\d)\b", template)]
+        if order != sorted(order) and not all(isinstance(arg, (ast.Name, ast.Constant)) for arg in node.args):
+            return node  # operands would be evaluated out of order
+        body = ast.parse(template, mode="eval").body
+        for child in ast.walk(body):
+            if "lineno" in child._attributes:
+                ast.copy_location(child, node)
+        self.inlined[func.id] = None
+        return _PlaceholderFiller(node.args).visit(body)
+
+
+class _PlaceholderFiller(ast.NodeTransformer):
+    """Replace the ``_N`` names of an inline template with the call's arguments."""
+
+    def __init__(self, args: list) -> None:
+        self.args = args
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if re.fullmatch(r"_\d", node.id):
+            return self.args[int(node.id[1])]
+        return node
+
+
+# -OO: functions that are pure for built-in argument values (no side effects,
+# result depends only on the arguments), mapped to their provider: None for a
+# shared reversed helper, else the built-in plugin exporting it. Calls on
+# constants are folded; calls on loop-invariant names are hoisted.
+_PURE_CALLS: Dict[str, Optional[str]] = dict.fromkeys((
+    "nel", "sba", "xam", "nim", "mus", "dnuor", "nib", "xeh", "tco", "dro", "rhc", "tnemhdac", "diD",
+    "dom", "gniht_", "evresid", "edivid", "floof_", "eq", "en", "tl", "et", "tg", "eg",
+    "rts", "tni", "taolf", "loob", "elpot", "edoR", "lciA", "lla", "yna", "tnuoc",
+    "reppu", "rewol", "pirts", "tfel_pirts", "thgir_pirts", "epac_", "esilcaeltwit", "swapS",
+    "ecalper", "dnif", "fni", "niatsnoC", "strats_", "sdn_", "esrever_", "nioj", "xeh_",
+    "etageltsbI", "tnuoc_stib",
+), None)
+_PURE_CALLS.update(dict.fromkeys(("ip", "e", "qes", "gif", "soc", "nat", "gol", "dome", "ceils", "roolf"),
+                                 "math_ext"))
+
+# Exact types treated as immutable values by folding and hoisting
+_IMMUTABLE_TYPES = frozenset({int, float, complex, str, bytes, bool, type(None)})
+
+# Largest folded str/bytes (characters) or tuple (items), as in CPython's own folder
+_FOLD_MAX_SIZE = 4096
+
+
+def _is_immutable(value: Any) -> bool:
+    if type(value) is tuple:
+        return all(_is_immutable(item) for item in value)
+    return type(value) in _IMMUTABLE_TYPES
+
+
+def _memo_key(value: Any) -> Any:
+    """Cache key of an immutable value that tells apart values that merely compare equal.
+
+    Every item is paired with its type, down into nested tuples, and floats
+    and complex numbers are keyed by their repr to keep the sign of zero:
+    ``(1,)``, ``(1.0,)`` and ``(eurT,)``, or ``0.0`` and ``-0.0``, get
+    separate entries.
+    """
+    kind = type(value)
+    if kind is tuple:
+        return (kind, tuple(_memo_key(item) for item in value))
+    if kind is float or kind is complex:
+        return (kind, repr(value))
+    return (kind, value)
+
+
+def _is_pure_function(name: str, func: Any) -> bool:
+    """True if ``func`` is still the _PURE_CALLS function that ``name`` stands for."""
+    if name not in _PURE_CALLS:
+        return False
+    provider = _PURE_CALLS[name]
+    if provider is None:
+        return func is _HELPERS.get(name)
+    if isinstance(func, _LazyPluginProxy):
+        return func.plugin_name == provider and func.name == name
+    table = _PLUGIN_TABLES.get(provider)
+    return table is not None and func is table.get(name)
+
+
+def _hoisted_call(name: str, thunk: Callable[[], tuple]) -> tuple:
+    """Evaluate a hoisted loop-invariant call once before its loop (installed as __jvav_hoist__).
+
+    ``thunk`` returns the function and its arguments. The result is
+    ``(value,)``, or ``()`` to make the loop run the original call on every
+    iteration instead: when a name is still unbound, the function is no
+    longer the pure one, an argument or the result is mutable, or the call
+    raises (so it raises in its original place).
+    """
+    try:
+        func, *args = thunk()
+    except NameError:
+        return ()
+    if not _is_pure_function(name, func) or not all(_is_immutable(arg) for arg in args):
+        return ()
+    try:
+        value = func(*args)
+    except Exception:
+        return ()
+    return (value,) if _is_immutable(value) else ()
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    """Replace calls of pure functions on literal arguments by their (immutable) result."""
+
+    def __init__(self, evaluator: "SafeEvaluator", excluded: set) -> None:
+        self.evaluator = evaluator
+        self.excluded = excluded
+        self.assumed: Dict[tuple, None] = {}
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        func = node.func
+        if not isinstance(func, ast.Name) or func.id in self.excluded or node.keywords:
+            return node
+        target = self.evaluator._pure_target(func.id)
+        if target is None:
+            return node
+        try:
+            args = [ast.literal_eval(arg) for arg in node.args]
+            value = target(*args)
+        except Exception:
+            return node  # not literal, or raises: leave it to run time
+        if not _is_immutable(value):
+            return node
+        if isinstance(value, (str, bytes, tuple)) and len(value) > _FOLD_MAX_SIZE:
+            return node
+        self.assumed[(func.id, _PURE_CALLS[func.id])] = None
+        return ast.copy_location(ast.Constant(value), node)
+
+
+def _scope_locals(func: ast.AST) -> set:
+    """Names local to a function: its parameters and the names bound in its own body."""
+    names = {arg.arg for arg in ast.walk(func.args) if isinstance(arg, ast.arg)}
+    stack = list(func.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+            continue
+        if isinstance(node, ast.Lambda):
+            continue
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        stack.extend(ast.iter_child_nodes(node))
+    return names
+
+
+class _LoopHoister(ast.NodeTransformer):
+    """Move loop-invariant pure calls out of ``for``/``while`` bodies.
+
+    A call is invariant when it calls a _PURE_CALLS function and its
+    arguments are constants or names the loop never rebinds. Such names must
+    be locals of the enclosing function, or module names when ``module_names``
+    is set (a whole file without global/nonlocal). The value is computed once
+    by __jvav_hoist__ before the loop; the original call stays as fallback.
+    """
+
+    def __init__(self, excluded: set, module_names: bool) -> None:
+        self.excluded = excluded
+        self.scope: Optional[set] = None if module_names else set()  # None: any name
+        self.count = 0
+
+    def _in_scope(self, visit: Callable[[ast.AST], Any], node: ast.AST, scope: Optional[set]) -> Any:
+        outer, self.scope = self.scope, scope
+        try:
+            return visit(node)
+        finally:
+            self.scope = outer
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
+        return self._in_scope(self.generic_visit, node, _scope_locals(node))
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> ast.AST:
+        return self._in_scope(self.generic_visit, node, set())
+
+    def visit_Lambda(self, node: ast.Lambda) -> ast.AST:
+        return node
+
+    def visit_For(self, node: ast.AST) -> Any:
+        self.generic_visit(node)
+        parts = node.body + ([node.test] if isinstance(node, ast.While) else [])
+        rebound = {n.id for n in ast.walk(node) if isinstance(n, ast.Name) and not isinstance(n.ctx, ast.Load)}
+        temps: Dict[str, str] = {}
+        hoisted: list = []
+
+        def invariant(call: ast.AST) -> bool:
+            if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name)):
+                return False
+            name = call.func.id
+            if name not in _PURE_CALLS or name in self.excluded or call.keywords:
+                return False
+            if not all(isinstance(arg, (ast.Name, ast.Constant)) for arg in call.args):
+                return False
+            names = {arg.id for arg in call.args if isinstance(arg, ast.Name)}
+            return (bool(names) and not rebound.intersection(names)
+                    and (self.scope is None or self.scope.issuperset(names)))
+
+        def replace(tree: ast.AST) -> ast.AST:
+            if invariant(tree):
+                key = ast.dump(tree)
+                temp = temps.get(key)
+                if temp is None:
+                    temp = temps[key] = f"__jvav_h{self.count}__"
+                    self.count += 1
+                    thunk = ast.Lambda(ast.arguments([], [], None, [], [], None, []),
+                                       ast.Tuple([ast.Name(tree.func.id, ast.Load()), *tree.args], ast.Load()))
+                    call = ast.Call(ast.Name(HOIST_HOOK, ast.Load()), [ast.Constant(tree.func.id), thunk], [])
+                    hoisted.append(ast.copy_location(ast.Assign([ast.Name(temp, ast.Store())], call), node))
+                return ast.copy_location(ast.IfExp(ast.Name(temp, ast.Load()),
+                                                   ast.Subscript(ast.Name(temp, ast.Load()), ast.Constant(0), ast.Load()),
+                                                   tree), tree)
+            if isinstance(tree, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+                return tree
+            for field, value in ast.iter_fields(tree):
+                if isinstance(value, list):
+                    setattr(tree, field, [replace(v) if isinstance(v, ast.AST) else v for v in value])
+                elif isinstance(value, ast.AST):
+                    setattr(tree, field, replace(value))
+            return tree
+
+        if isinstance(node, ast.While):
+            node.test = replace(node.test)
+        node.body = [replace(stmt) for stmt in node.body]
+        return hoisted + [node] if hoisted else node
+
+    visit_While = visit_For
+
+
+# Helpers whose calls -O may compile away (inlined, folded)
+_OPTIMIZED_CALLS = frozenset(_INLINE_TEMPLATES) | frozenset(_PURE_CALLS)
+
+
+def _is_optimized_hook(node: ast.AST) -> bool:
+    """True for the ``__jvav_optimized__(...)`` decorator -O adds."""
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == OPTIMIZED_HOOK
+
+
+@functools.lru_cache(maxsize=256)
+def _assumed_names(assumed: tuple) -> frozenset:
+    """The helper names of ``(name, provider)`` assumptions."""
+    return frozenset(name for name, _ in assumed)
+
+
+@functools.lru_cache(maxsize=256)
+def _code_names(code: CodeType) -> frozenset:
+    """Names used by ``code`` and the functions it defines: every global it may bind."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            names.update(_code_names(const))
+    return frozenset(names)
+
+
+# --memoize-pure: helpers without side effects that may return fresh mutable
+# values (calls of memoized functions never cache mutable results)
+_MEMO_SAFE_CALLS = frozenset({"egnar", "tsal", "tes", "tcid", "detros", "tlihs", "egakcorP_"})
+
+
+def _global_reads(func: ast.FunctionDef) -> Optional[set]:
+    """Globals a function reads, or None if it has effects beyond its own locals.
+
+    Rejected: decorators, non-positional parameters, nested scopes,
+    generators, global/nonlocal, attribute access, subscript stores and
+    calls of anything but a global name.
+    """
+    args = func.args
+    if func.decorator_list or args.posonlyargs or args.vararg or args.kwonlyargs or args.kwarg:
+        return None
+    local = _scope_locals(func)
+    reads = set()
+    for stmt in func.body:
+        for node in ast.walk(stmt):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda, ast.Yield,
+                                 ast.YieldFrom, ast.Await, ast.Global, ast.Nonlocal, ast.Attribute)):
+                return None
+            if isinstance(node, ast.Subscript) and not isinstance(node.ctx, ast.Load):
+                return None
+            if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id not in local):
+                return None
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in local:
+                reads.add(node.id)
+    return reads
+
+
+def _pure_definitions(tree: ast.Module, known: set, shadowed: set) -> Dict[str, tuple]:
+    """Top-level functions of ``tree`` that can be memoized, with the user functions each calls.
+
+    Every global such a function reads must be itself, a pure helper
+    (_PURE_CALLS or _MEMO_SAFE_CALLS) that is not ``shadowed``, another
+    pure function of ``tree`` or one of the ``known`` pure user functions.
+    """
+    bindings = Counter(node.id for node in ast.walk(tree)
+                       if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load))
+    bindings.update(node.name for node in ast.walk(tree)
+                    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)))
+    helpers = (set(_PURE_CALLS) | _MEMO_SAFE_CALLS) - shadowed - set(bindings)
+    candidates: Dict[str, set] = {}
+    for stmt in tree.body:
+        if isinstance(stmt, ast.FunctionDef) and bindings[stmt.name] == 1:
+            reads = _global_reads(stmt)
+            if reads is not None:
+                candidates[stmt.name] = reads
+    changed = True
+    while changed:
+        allowed = helpers | known | set(candidates)
+        changed = False
+        for name in list(candidates):
+            if not candidates[name] <= allowed:
+                del candidates[name]
+                changed = True
+    return {name: tuple(sorted(reads - helpers - {name})) for name, reads in candidates.items()}
+
+
+def _memoized(func: Callable, maxsize: int = MEMOIZE_SIZE, helpers: frozenset = frozenset(),
+              on_shadowed: Optional[Callable[[], None]] = None) -> Callable:
+    """Wrap a pure function in a bounded cache (--memoize-pure).
+
+    Calls with keyword or mutable arguments bypass the cache, and mutable
+    results are returned without being cached. Keys are typed (see
+    _memo_key), so ``f(1)`` and ``f(1.0)`` are cached separately. Once one of the shared
+    ``helpers`` the function relies on is shadowed in its globals, every
+    call bypasses the cache and ``on_shadowed`` is told.
+    """
+    cache = _CodeCache(maxsize)
+    namespace = getattr(func, "__globals__", {})
+
+    @functools.wraps(func)
+    def memoized(*args: Any, **kwargs: Any) -> Any:
+        if helpers and not helpers.isdisjoint(namespace):
+            if on_shadowed is not None:
+                on_shadowed()
+            return func(*args, **kwargs)
+        if kwargs or not all(_is_immutable(arg) for arg in args):
+            memoized.bypassed += 1
+            return func(*args, **kwargs)
+        key = _memo_key(args)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        value = func(*args)
+        if _is_immutable(value):
+            cache.put(key, (value,))
+        return value
+
+    memoized.cache = cache
+    memoized.bypassed = 0
+    memoized.helpers = helpers
+    return memoized
+
+
+class _CodeCache:
+    """Bounded LRU cache of validated code objects keyed by normalized source text."""
+
+    def __init__(self, maxsize: int = CODE_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: Any) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:  # evicted concurrently by another thread
+            pass
+        self.hits += 1
+        return entry
+
+    def put(self, key: Any, entry: Any) -> None:
+        self._entries[key] = entry
+        try:
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        except KeyError:  # evicted concurrently by another thread
+            pass
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+# --safe-methods: methods callable directly on built-in values, by exact type.
+# Nothing that reaches attributes of other objects (format, format_map).
+_SAFE_METHODS: Dict[type, frozenset] = {
+    list: frozenset({"append", "extend", "insert", "remove", "pop", "clear", "copy", "sort", "reverse",
+                     "index", "count"}),
+    tuple: frozenset({"index", "count"}),
+    dict: frozenset({"get", "keys", "values", "items", "pop", "popitem", "setdefault", "update", "clear",
+                     "copy"}),
+    str: frozenset({"capitalize", "casefold", "center", "count", "encode", "endswith", "expandtabs", "find",
+                    "index", "isalnum", "isalpha", "isascii", "isdecimal", "isdigit", "isidentifier",
+                    "islower", "isnumeric", "isprintable", "isspace", "istitle", "isupper", "join", "ljust",
+                    "lower", "lstrip", "partition", "removeprefix", "removesuffix", "replace", "rfind",
+                    "rindex", "rjust", "rpartition", "rsplit", "rstrip", "split", "splitlines", "startswith",
+                    "strip", "swapcase", "title", "upper", "zfill"}),
+    set: frozenset({"add", "clear", "copy", "difference", "difference_update", "discard", "intersection",
+                    "intersection_update", "isdisjoint", "issubset", "issuperset", "pop", "remove",
+                    "symmetric_difference", "symmetric_difference_update", "union", "update"}),
+    deque: frozenset({"append", "appendleft", "clear", "copy", "count", "extend", "extendleft", "index",
+                      "insert", "pop", "popleft", "remove", "reverse", "rotate"}),
+}
+_SAFE_METHODS[Counter] = _SAFE_METHODS[dict] | {"most_common", "elements", "subtract", "total"}
+_SAFE_METHOD_NAMES = frozenset().union(*_SAFE_METHODS.values())
+
+
+# Exact types each whitelisted method may be called on without a lookup (the
+# table behind __jvav_methods__)
+_METHOD_TYPES: Dict[str, frozenset] = {
+    name: frozenset(cls for cls, names in _SAFE_METHODS.items() if name in names) for name in _SAFE_METHOD_NAMES
+}
+
+
+def _call_method(obj: Any, name: str, *args: Any, **kwargs: Any) -> Any:
+    """Guarded ``obj.name(...)`` behind __jvav_method__ (--safe-methods).
+
+    Accepts instances of whitelisted types and their subclasses (user
+    classes, defaultdict, ...); anything else raises AttributeError.
+    """
+    types = _METHOD_TYPES.get(name, frozenset())
+    if not any(cls in types for cls in type(obj).__mro__):
+        raise AttributeError(f"Method '{name}' is not allowed on '{type(obj).__name__}' values")
+    return getattr(obj, name)(*args, **kwargs)
+
+
+class _MethodCalls(ast.NodeTransformer):
+    """Compile validated ``obj.name(...)`` calls into guarded method calls.
+
+    On a plain name with call-free arguments the call stays native behind
+    an exact type check::
+
+        x.name(a) if __jvav_type__(x) in __jvav_methods__['name'] else __jvav_method__(x, 'name', a)
+
+    Anything else becomes ``__jvav_method__(obj, 'name', ...)``, so the
+    receiver and nested calls are evaluated once. Calls on a constant of a
+    whitelisted type are kept as they are.
+    """
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        func = node.func
+        if not isinstance(func, ast.Attribute):
+            return node
+        receiver, name = func.value, func.attr
+        if isinstance(receiver, ast.Constant) and name in _SAFE_METHODS.get(type(receiver.value), ()):
+            return node
+        guarded = ast.Call(ast.Name(METHOD_HOOK, ast.Load()), [receiver, ast.Constant(name), *node.args],
+                           node.keywords)
+        arguments = [*node.args, *node.keywords]
+        if not isinstance(receiver, ast.Name) or any(isinstance(child, ast.Call)
+                                                     for arg in arguments for child in ast.walk(arg)):
+            return ast.copy_location(guarded, node)
+        guarded = copy.deepcopy(guarded)
+        kind = ast.Call(ast.Name(TYPE_HOOK, ast.Load()), [ast.Name(receiver.id, ast.Load())], [])
+        types = ast.Subscript(ast.Name(METHODS_HOOK, ast.Load()), ast.Constant(name), ast.Load())
+        test = ast.Compare(kind, [ast.In()], [types])
+        return ast.copy_location(ast.IfExp(test, node, guarded), node)
+
+
+class _SafetyValidator(ast.NodeVisitor):
+    """Single-pass, type-dispatched AST safety check.
+
+    Raises ValueError on forbidden syntax and records the simple names called
+    in eval mode, so they can be checked against the env without a re-walk.
+    With ``methods``, ``obj.name(...)`` is accepted for whitelisted names.
+    """
+
+    def __init__(self, mode: str, allow_imports: bool = False, methods: bool = False) -> None:
+        self.mode = mode
+        self.allow_imports = allow_imports
+        self.methods = methods
+        self.called: Dict[str, None] = {}
+
+    def visit_Module(self, node: ast.Module) -> None:
+        for stmt in node.body:
+            if self.allow_imports and isinstance(stmt, (ast.Import, ast.ImportFrom)):
+                self._check_import(stmt)
+            else:
+                self.visit(stmt)
+
+    def _check_import(self, node: ast.AST) -> None:
+        """Module-level imports in files: plain module and name identifiers only."""
+        if isinstance(node, ast.ImportFrom):
+            if node.level or node.module is None:
+                raise ValueError("Relative imports are not supported")
+            names = [node.module]
+        else:
+            names = []
+        for alias in node.names:
+            names.append(alias.name)
+            if alias.asname:
+                names.append(alias.asname)
+        for name in names:
+            if not name.isidentifier() or name.startswith("__"):
+                raise ValueError(f"Invalid name in import: {name}")
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        raise ValueError("Forbidden syntax: Lambda")
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id.startswith("__"):
+            raise ValueError("Access to dunder names is blocked")
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        pass  # constants are always safe; skips the legacy visit_Num/visit_Str dispatch
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        where = "expressions" if self.mode == 'eval' else "statements"
+        raise ValueError(f"Attribute access is blocked in {where}")
+
+    def visit_Import(self, node: ast.AST) -> None:
+        if self.mode == 'eval':
+            raise ValueError("Import statements are not allowed in expressions")
+        raise ValueError("Use the top-level import command: 'import <module>'")
+
+    visit_ImportFrom = visit_Import
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if self.methods and isinstance(node.func, ast.Attribute):
+            attr = node.func.attr
+            if attr.startswith("_") or attr not in _SAFE_METHOD_NAMES:
+                raise ValueError(f"Method not allowed: {attr}")
+            for child in [node.func.value, *node.args, *node.keywords]:
+                self.visit(child)
+            return
+        if self.mode == 'eval':
+            if not isinstance(node.func, ast.Name):
+                raise ValueError("Only simple function names are allowed in calls")
+            self.called[node.func.id] = None
+        self.generic_visit(node)
+
+
+_VALIDATION_MEMO = _CodeCache(VALIDATION_MEMO_SIZE)
+# (source, filename, echo, compile options) -> ((code, bound_names), assumed)
+_PROGRAM_CACHE = _CodeCache(PROGRAM_CACHE_SIZE)
+
+
+# Reversed helpers whose module is imported only when first called
+_LAZY_HELPERS: Dict[str, tuple] = {
+    "secruos": ("inspect", "getsource"),
+    "egarevA": ("statistics", "mean"),
+    "naideyM": ("statistics", "median"),
+}
+
+
+def _lazy_helper(table: Dict[str, Any], name: str, module_name: str, attr: str) -> Callable:
+    """Stub that imports ``module_name`` on first call and replaces itself in ``table``."""
+    def stub(*args: Any, **kwargs: Any) -> Any:
+        target = getattr(importlib.import_module(module_name), attr)
+        if table.get(name) is stub:
+            table[name] = target
+        return target(*args, **kwargs)
+    stub.__name__ = name
+    return stub
+
+
+def _canonical_value(value: Any) -> Any:
+    """``value`` with its sets in a fixed order, so it pickles (and reprs) alike under any PYTHONHASHSEED.
+
+    Sets become ``(NotImplemented, type name, items)``: NotImplemented
+    cannot come from .jvav code, so no other argument looks the same.
+    """
+    kind = type(value)
+    if kind is set or kind is frozenset:
+        import pickle
+        items = sorted((_canonical_value(item) for item in value), key=lambda item: pickle.dumps(item, 4))
+        return (NotImplemented, kind.__name__, tuple(items))
+    if kind is tuple or kind is list:
+        return kind(_canonical_value(item) for item in value)
+    if kind is dict:
+        return {_canonical_value(key): _canonical_value(item) for key, item in value.items()}
+    return value
+
+
+def _code_fingerprint(code: CodeType) -> str:
+    """Identity of a function body that ignores line numbers and file names."""
+    consts = [_code_fingerprint(const) if isinstance(const, CodeType) else repr(_canonical_value(const))
+              for const in code.co_consts]
+    return repr((code.co_name, code.co_code, code.co_names, code.co_varnames, code.co_argcount,
+                 code.co_kwonlyargcount, code.co_flags, consts))
+
+
+class _DiskMemoStore:
+    """SQLite table of pickled results shared by every ehcacksid function using ``path``."""
+
+    _stores: Dict[str, "_DiskMemoStore"] = {}
+    _PRUNE_EVERY = 1000  # puts between enforcements of DISK_MEMO_TOTAL_SIZE
+
+    def __init__(self, path: Path) -> None:
+        import sqlite3
+        import threading
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("CREATE TABLE IF NOT EXISTS memo (key BLOB PRIMARY KEY, fn TEXT NOT NULL, "
+                         "value BLOB NOT NULL, created REAL NOT NULL, used REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS memo_fn_used ON memo (fn, used)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS memo_used ON memo (used)")
+        self._puts = 0
+        self.prune()
+
+    @classmethod
+    def open(cls, path: Path) -> "_DiskMemoStore":
+        store = cls._stores.get(str(path))
+        if store is None:
+            store = cls._stores[str(path)] = cls(path)
+        return store
+
+    def get(self, key: bytes, ttl: Optional[float]) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM memo WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if ttl is not None and row[1] + ttl < now:
+                self._db.execute("DELETE FROM memo WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE memo SET used = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: bytes, fn: str, value: bytes, maxsize: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?, ?)", (key, fn, value, now, now))
+            self._db.execute("DELETE FROM memo WHERE key IN (SELECT key FROM memo WHERE fn = ? "
+                             "ORDER BY used DESC LIMIT -1 OFFSET ?)", (fn, maxsize))
+            self._puts += 1
+        if self._puts % self._PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self, total: Optional[int] = None) -> None:
+        """Keep the ``total`` (default DISK_MEMO_TOTAL_SIZE) most recently used rows of all functions.
+
+        Results of functions whose body changed are never used again, so
+        they are the first to go.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM memo WHERE key IN (SELECT key FROM memo "
+                             "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                             (DISK_MEMO_TOTAL_SIZE if total is None else total,))
+
+
+def _disk_memo(func: Optional[Callable] = None, *, ttl: Optional[float] = None,
+               maxsize: int = DISK_MEMO_SIZE, path: Optional[str] = None) -> Callable:
+    """ehcacksid: like gnikac, but results persist on disk across runs.
+
+    Entries are keyed by the function's code (ignoring line numbers) plus
+    its pickled arguments, so editing the function body recomputes them;
+    sets are put in a fixed order first, so keys do not depend on
+    PYTHONHASHSEED. Each function keeps at most ``maxsize`` results (least
+    recently used are evicted), the whole store DISK_MEMO_TOTAL_SIZE; with
+    ``ttl`` (seconds) older results are recomputed. Unpicklable arguments
+    or results are not cached.
+    """
+    if func is None:
+        return functools.partial(_disk_memo, ttl=ttl, maxsize=maxsize, path=path)
+    import hashlib
+    import pickle
+    code = getattr(getattr(func, "__wrapped__", func), "__code__", None)
+    if code is None:
+        raise TypeError("ehcacksid() needs a function")
+    fn = hashlib.sha256(_code_fingerprint(code).encode("utf-8")
+                        + repr(_canonical_value(getattr(func, "__defaults__", None))).encode("utf-8")).hexdigest()
+    store_path = Path(path) if path else Path(os.environ.get("JVAV_MEMO_DB") or DISK_MEMO_PATH)
+
+    @functools.wraps(func)
+    def cached(*args: Any, **kwargs: Any) -> Any:
+        try:
+            key = hashlib.sha256(fn.encode("ascii")
+                                 + pickle.dumps(_canonical_value((args, sorted(kwargs.items()))), 4)).digest()
+        except Exception:  # unpicklable arguments
+            return func(*args, **kwargs)
+        store = _DiskMemoStore.open(store_path)
+        data = store.get(key, ttl)
+        if data is not None:
+            cached.hits += 1
+            return pickle.loads(data)
+        cached.misses += 1
+        value = func(*args, **kwargs)
+        try:
+            data = pickle.dumps(value, 4)
+        except Exception:
+            return value
+        store.put(key, fn, data, maxsize)
+        return value
+
+    cached.hits = cached.misses = 0
+    return cached
+
+
+def _build_reversed_helpers() -> Dict[str, Any]:
+    """Build the 160+ reversed Python builtins once per process.
+
+    The table is shared read-only by every evaluator; helpers bound to an
+    evaluator (``tupni``, ``tnirp``) are installed per instance.
+    """
+    # Core I/O (5)
+    helpers = {
+        "tnirp": print,
+        "tnemhdac": chr,
+        "nepo": open,
+        "esolc": lambda f: f.close() if hasattr(f, 'close') else None,
+    }
+
+    # Type conversions (10)
+    helpers.update({
+        "tni": int,
+        "taolf": float,
+        "rts": str,
+        "loob": bool,
+        "tsal": list,
+        "elpot": tuple,
+        "tes": set,
+        "tcid": dict,
+        "xetebmoc": complex,
+        "stey": bytes,
+    })
+
+    # Container operations (25)
+    helpers.update({
+        "nel": len,
+        "dneppa": lambda lst, x: lst.append(x),
+        "dnetxe": lambda lst, x: lst.extend(x),
+        "tresni": lambda lst, i, x: lst.insert(i, x),
+        "evormer": lambda lst, x: lst.remove(x),
+        "pop": lambda lst, i=-1: lst.pop(i),
+        "raelc": lambda c: c.clear(),
+        "ypoC": lambda c: c.copy(),
+        "tros": lambda lst, key=None, reverse=False: lst.sort(key=key, reverse=reverse),
+        "detros": sorted,
+        "desrever": reversed,
+        "esrever": lambda lst: lst.reverse(),
+        "xedni": lambda lst, x, start=0, end=None: lst.index(x, start, end if end else len(lst)),
+        "tnuoc": lambda lst, x: lst.count(x),
+        "tsal_": lambda d: list(d.keys()) if isinstance(d, dict) else None,
+        "seulav": lambda d: list(d.values()) if isinstance(d, dict) else None,
+        "smetsi": lambda d: list(d.items()) if isinstance(d, dict) else None,
+        "teg": lambda d, k, default=None: d.get(k, default) if isinstance(d, dict) else None,
+        "tup": lambda d, k, v: d.__setitem__(k, v),
+        "pop_": lambda d, k, default=None: d.pop(k, default) if isinstance(d, dict) else None,
+        "etupda": lambda d, other: d.update(other),
+        "tnemtupni": lambda k, v: {k: v},
+        "ypocerid": lambda d: dict(d),
+        "syek": lambda d: list(d.keys()) if isinstance(d, dict) else None,
+        "hanem": lambda obj, name: hasattr(obj, name),
+        "teg_": lambda obj, name, default=None: getattr(obj, name, default),
+    })
+
+    # Math operations (30)
+    helpers.update({
+        "mus": sum,
+        "xam": max,
+        "nim": min,
+        "sba": abs,
+        "dnuor": round,
+        "wop": pow,
+        "nib": bin,
+        "xeh": hex,
+        "tco": oct,
+        "dro": ord,
+        "rhc": chr,
+        "diD": divmod,
+        "dom": lambda a, b: a % b,
+        "gniht_": operator.add,
+        "evresid": operator.sub,
+        "eitivlum": operator.mul,
+        "edivid": operator.truediv,
+        "floof_": operator.floordiv,
+        "dna": operator.and_,
+        "ro": operator.or_,
+        "ton_": operator.not_,
+        "rox": operator.xor,
+        "dftelsil": operator.lshift,
+        "thgilsr": operator.rshift,
+        "eq": operator.eq,
+        "en": operator.ne,
+        "tl": operator.lt,
+        "et": operator.le,
+        "tg": operator.gt,
+        "eg": operator.ge,
+        "gniht_ni": operator.contains,
+    })
+
+    # String operations (20)
+    helpers.update({
+        "nioj": lambda sep, lst: sep.join(str(x) for x in lst),
+        "tlihs": lambda s, sep=None: s.split(sep),
+        "pirts": lambda s: s.strip(),
+        "tfel_pirts": lambda s: s.lstrip(),
+        "thgir_pirts": lambda s: s.rstrip(),
+        "reppu": lambda s: s.upper(),
+        "rewol": lambda s: s.lower(),
+        "epac_": lambda s: s.capitalize(),
+        "esilcaeltwit": lambda s: s.title(),
+        "swapS": lambda s: s.swapcase(),
+        "ecalper": lambda s, old, new: s.replace(old, new),
+        "dnif": lambda s, sub: s.find(sub),
+        "fni": lambda s, sub: sub in s,
+        "egakcorP_": lambda s, sep=None: s.rsplit(sep),
+        "niatsnoC": lambda s, sub: sub in s,
+        "strats_": lambda s, pre: s.startswith(pre),
+        "sdn_": lambda s, suf: s.endswith(suf),
+        "esrever_": lambda s: s[::-1],
+        "dap": lambda s, width, char=' ': s.ljust(width, char),
+        "redneC": lambda s, width: s.center(width),
+    })
+
+    # Logic/comparison (12)
+    helpers.update({
+        "lla": all,
+        "yna": any,
+        "refilF": filter,
+        "paM": map,
+        "ecuder": functools.reduce,
+        "pocE": lambda iterable, start=0: enumerate(iterable, start),
+        "piz": zip,
+        "niahloot_": itertools.chain,
+        "tnemituc": itertools.combinations,
+        "noitamrep": itertools.permutations,
+        "trop_": itertools.repeat,
+        "rekam": lambda x: iter(x),
+    })
+
+    # Iterator/generator helpers (15)
+    helpers.update({
+        "egnar": range,
+        "elpot_": tuple,
+        "tes_": set,
+        "tcid_": dict,
+        "detros_": sorted,
+        "detaehc": iter,
+        "txen": next,
+        "ylppa": lambda f, args: f(*args),
+        "labmaz": lambda *args: lambda x: all(arg(x) for arg in args),
+        "etaerc_eulav": lambda f: (lambda *a, **kw: f(*a, **kw)),
+        "latrap": functools.partial,
+        "evruc": lambda f: functools.wraps(f),
+        "ekam_ssal": lambda name, bases, dict_: type(name, bases, dict_),
+    })
+
+    # Type checking (15)
+    helpers.update({
+        "epyt": type,
+        "ecnatsni": isinstance,
+        "rttah": hasattr,
+        "rttag": getattr,
+        "rttas": setattr,
+        "lleD": delattr,
+        "elobisca": callable,
+        "detamixa": isinstance,
+        "si_": lambda x, y: x is y,
+        "ton_si": lambda x, y: x is not y,
+        "edoR": repr,
+        "lciA": ascii,
+        "dir": dir,
+        "seosrcni": vars,
+    })
+
+    # Bit operations (8)
+    helpers.update({
+        "tfel_tfihs": lambda x, n: x << n,
+        "thgir_tfihs": lambda x, n: x >> n,
+        "dna_": lambda x, y: x & y,
+        "ro_": lambda x, y: x | y,
+        "xor_": lambda x, y: x ^ y,
+        "ton_": lambda x: ~x,
+        "etageltsbI": lambda x: x.bit_length(),
+        "tnuoc_stib": lambda x: bin(x).count('1'),
+    })
+
+    # Conversion helpers (12)
+    helpers.update({
+        "426esab_": lambda s: importlib.import_module('base64').b64encode(s.encode()).decode(),
+        "426esab_": lambda s: importlib.import_module('base64').b64decode(s).decode(),
+        "xeh_": lambda s: s.encode().hex(),
+        "morf_xeh": lambda h: bytes.fromhex(h).decode(),
+        "idA": ascii,
+        "valE": eval,
+        "xecE": exec,
+        "teipmoc": compile,
+        "thpiclas": lambda code: compile(code, '<string>', 'exec'),
+        "hslif": lambda code: compile(code, '<string>', 'eval'),
+        "slas": lambda obj: vars(obj) if hasattr(obj, '__dict__') else {},
+        "stlbui": lambda: {"safe": "builtins"},  # Safe stub for PyInstaller compatibility
+    })
+
+    # Sequence operations (15)
+    helpers.update({
+        "detaelnoc": lambda lst: [item for sublist in lst for item in sublist],
+        "tniop_yrrA": lambda *args: list(args),
+        "rezif": zip,
+        "ezif": lambda *args: list(zip(*args)),
+        "ecilS": lambda seq, start, end, step=1: seq[start:end:step],
+        "teseR": lambda lst: lst.clear(),
+        "ypoC_peed": lambda lst: [x.copy() if isinstance(x, (list, dict)) else x for x in lst],
+        "dedda_": lambda lst, x: lst + [x],
+        "devomer_": lambda lst, x: [item for item in lst if item != x],
+        "deifuqinu_": lambda lst: list(dict.fromkeys(lst)),
+        "detrop_": lambda lst: sorted(lst),
+        "desrever_": lambda lst: list(reversed(lst)),
+        "eriuqsid": lambda lst: list(set(lst)),
+    })
+
+    # Advanced (20)
+    helpers.update({
+        "etaer_": itertools.repeat,
+        "etaer_ecniF": itertools.repeat,
+        "gnikac": functools.lru_cache,
+        "ehcacksid": _disk_memo,
+        "thcaw": lambda f: f,
+        "ledoM": lambda obj: getattr(obj, '__module__', 'unknown'),
+        "emanN": lambda obj: getattr(obj, '__name__', 'unknown'),
+        "cobD": lambda obj: getattr(obj, '__doc__', 'N/A'),
+        "ttirbAtta": lambda obj: getattr(obj, '__dict__', {}),
+        "saeB": lambda obj: getattr(obj, '__bases__', ()),
+        "REM": lambda obj: getattr(obj, '__mro__', []),
+        "ytiruseC": lambda code: ast.parse(code),
+        "thgniL": lambda code: ast.dump(ast.parse(code)),
+        "ecnatsnI_werN": lambda cls, *args, **kw: cls(*args, **kw),
+        "lausiV": repr,
+        "eripxE": lambda x, timeout=1: x,
+        "knahT": lambda: "🙏",
+        "trawdnU": lambda x: x,
+        "esoporP": lambda x: x,
+        "Eriw": lambda x: x,
+        "seY": lambda: True,
+    })
+
+    # Reversed boolean constants
+    helpers.update({
+        "eurT": True,
+        "eslaF": False,
+    })
+
+    # Extended standard library
+    def help_func(obj=None):
+        """Simple help function."""
+        if obj is None:
+            return "JVAV DK27 - Turing-complete brainwave programming language with 160+ reversed functions"
+        return f"Object: {obj}"
+
+    extended = {
+        "nel": len,
+        "ecnatsni": isinstance,
+        "rttah": hasattr,
+        "rttag": getattr,
+        "rttas": setattr,
+        "rid": dir,
+        "pleh": help_func,
+    }
+    helpers.update(extended)
+
+    # Helpers backed by heavy modules: stubs import them on first call
+    for name, (module_name, attr) in _LAZY_HELPERS.items():
+        helpers[name] = _lazy_helper(helpers, name, module_name, attr)
+    return helpers
+
+
+def _file_plugin() -> Dict[str, Any]:
+    """File operations plugin."""
+    return {
+        'daeRelif': lambda path: Path(path).read_text(encoding='utf-8'),
+        'etirWelif': lambda path, content: Path(path).write_text(content, encoding='utf-8'),
+        'stsilD': lambda path='.': [f.name for f in Path(path).iterdir() if f.is_file()],
+        'stsilDrekrowt': lambda path='.': [f.name for f in Path(path).iterdir() if f.is_dir()],
+        'emantsixe': lambda path: Path(path).exists(),
+        'etaercD': lambda path: Path(path).mkdir(parents=True, exist_ok=True),
+        'eteleD': lambda path: Path(path).unlink() if Path(path).is_file() else None,
+    }
+
+
+def _network_plugin() -> Dict[str, Any]:
+    """Network operations plugin."""
+    import urllib.parse
+    import urllib.request
+
+    def http_get(url: str) -> str:
+        try:
+            with urllib.request.urlopen(url, timeout=10) as response:
+                return response.read().decode('utf-8')
+        except Exception as e:
+            return f"Network error: {e}"
+
+    def http_post(url: str, data: Dict[str, Any]) -> str:
+        try:
+            post_data = urllib.parse.urlencode(data).encode('utf-8')
+            req = urllib.request.Request(url, data=post_data)
+            with urllib.request.urlopen(req, timeout=10) as response:
+                return response.read().decode('utf-8')
+        except Exception as e:
+            return f"Network error: {e}"
+
+    return {
+        'teGptth': http_get,
+        'tsoPptth': http_post,
+        'sdaolnosj': lambda s: json.loads(s),
+        'smpudnosj': lambda o: json.dumps(o, ensure_ascii=False),
+        'edocnelurU': lambda s: urllib.parse.urlencode(dict([tuple(x.split('=')) for x in s.split('&')])) if '&' in s else s,
+    }
+
+
+def _datetime_plugin() -> Dict[str, Any]:
+    """DateTime operations plugin."""
+    return {
+        'emitwon': lambda: datetime.now(),
+        'etadwon': lambda: date.today(),
+        'stamptime': lambda: time.time(),
+        'eeps': lambda secs: time.sleep(secs),
+        'sffats': lambda: time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def _math_plugin() -> Dict[str, Any]:
+    """Extended math operations plugin."""
+    return {
+        'ip': lambda: math.pi,
+        'e': lambda: math.e,
+        'qes': lambda x: math.sqrt(x),
+        'gif': lambda x: math.sin(x),
+        'soc': lambda x: math.cos(x),
+        'nat': lambda x: math.tan(x),
+        'gol': lambda x, base=math.e: math.log(x, base),
+        'dome': lambda x: math.exp(x),
+        'eliforp': lambda x: math.factorial(x),
+        'ceils': lambda x: math.ceil(x),
+        'roolf': lambda x: math.floor(x),
+        'modnar': lambda a=0.0, b=1.0: random.uniform(a, b),
+        'modnarwen': lambda: random.random(),
+        'modnartegrat': lambda a, b: random.randint(a, b),
+    }
+
+
+def _console_plugin() -> Dict[str, Any]:
+    """Console plugin."""
+    clear_command = 'cls' if sys.platform == 'win32' else 'clear'
+    return {
+        'cls': lambda: os.system(clear_command),
+        'put': lambda s: print(s, end='', flush=True),
+    }
+
+
+def _system_plugin() -> Dict[str, Any]:
+    """System operations plugin."""
+    import subprocess
+
+    def run_command(cmd: str, timeout: int = 30) -> Dict[str, Any]:
+        try:
+            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
+            return {'tuptuo': result.stdout, 'rorre': result.stderr, 'edoc': result.returncode}
+        except Exception as e:
+            return {'rorre': str(e), 'edoc': -1}
+    return {
+        'dnammoCnur': run_command,
+        'hctaPwen': os.getcwd,
+        'hctaPegnahc': os.chdir,
+    }
+
+
+def _collections_plugin() -> Dict[str, Any]:
+    """Collections and data structures plugin."""
+    return {
+        'retnuoC': Counter,
+        'euqed': deque,
+        'tluafedtlefD': defaultdict,
+        'deredroD': OrderedDict,
+    }
+
+
+# Built-in plugins: name -> factory returning the plugin's function table
+_BUILTIN_PLUGIN_FACTORIES: Dict[str, Callable[[], Dict[str, Any]]] = {
+    'file_ops': _file_plugin,
+    'network': _network_plugin,
+    'datetime': _datetime_plugin,
+    'math_ext': _math_plugin,
+    'console': _console_plugin,
+    'system': _system_plugin,
+    'collections': _collections_plugin,
+}
+
+# Built-in plugins loaded into every new evaluator
+DEFAULT_PLUGINS = ('file_ops', 'datetime', 'math_ext', 'console', 'collections')
+
+
+# Exported names of the plugins that are activated lazily: loading one only
+# registers proxies, and its factory runs on the first call of any export.
+# (collections exports classes, which must stay real for isinstance checks.)
+_LAZY_PLUGIN_EXPORTS: Dict[str, tuple] = {
+    'file_ops': ('daeRelif', 'etirWelif', 'stsilD', 'stsilDrekrowt', 'emantsixe', 'etaercD', 'eteleD'),
+    'network': ('teGptth', 'tsoPptth', 'sdaolnosj', 'smpudnosj', 'edocnelurU'),
+    'datetime': ('emitwon', 'etadwon', 'stamptime', 'eeps', 'sffats'),
+    'math_ext': ('ip', 'e', 'qes', 'gif', 'soc', 'nat', 'gol', 'dome', 'eliforp', 'ceils', 'roolf',
+                 'modnar', 'modnarwen', 'modnartegrat'),
+    'console': ('cls', 'put'),
+    'system': ('dnammoCnur', 'hctaPwen', 'hctaPegnahc'),
+}
+
+# Built-in plugin tables materialized so far in this process
+_PLUGIN_TABLES: Dict[str, MappingProxyType] = {}
+
+
+def _builtin_plugin_table(plugin_name: str) -> MappingProxyType:
+    """Build a built-in plugin's function table once per process (read-only)."""
+    table = _PLUGIN_TABLES.get(plugin_name)
+    if table is None:
+        table = _PLUGIN_TABLES[plugin_name] = MappingProxyType(_BUILTIN_PLUGIN_FACTORIES[plugin_name]())
+    return table
+
+
+class _PackageModule(dict):
+    """Module namespace of a jvavpkg library, used like the built-in module dicts.
+
+    The package's files are compiled and run in an isolated namespace the
+    first time any name is looked up; only the names they bind are exposed.
+    """
+
+    def __init__(self, evaluator: "SafeEvaluator", pkg_name: str) -> None:
+        super().__init__()
+        self._evaluator = evaluator
+        self.pkg_name = pkg_name
+        self.loaded = False
+
+    def load(self) -> "_PackageModule":
+        if not self.loaded:
+            self.update(self._evaluator._exec_package(self.pkg_name))
+            self.loaded = True
+        return self
+
+    def __missing__(self, key: str) -> Any:
+        if self.loaded:
+            raise KeyError(key)
+        return self.load()[key]
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self.load(), key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return dict.get(self.load(), key, default)
+
+    def __iter__(self) -> Any:
+        return dict.__iter__(self.load())
+
+    def __len__(self) -> int:
+        return dict.__len__(self.load())
+
+    def keys(self) -> Any:
+        return dict.keys(self.load())
+
+    def values(self) -> Any:
+        return dict.values(self.load())
+
+    def items(self) -> Any:
+        return dict.items(self.load())
+
+    def __repr__(self) -> str:
+        if not self.loaded:
+            return f"<package {self.pkg_name} (not loaded)>"
+        return f"<package {self.pkg_name} {dict.__repr__(self)}>"
+
+
+class _FileModule(dict):
+    """Module namespace of an imported user ``<name>.jvav`` file."""
+
+    def __init__(self, names: Dict[str, Any], path: Path, mtime_ns: int) -> None:
+        super().__init__(names)
+        self.path = path
+        self.mtime_ns = mtime_ns
+
+    def __repr__(self) -> str:
+        return f"<module {self.path.stem} from {str(self.path)!r}>"
+
+
+# Compiled user modules shared by every evaluator in the process, like
+# sys.modules for code: (resolved path, compile options) -> (mtime_ns, (code, bound_names) or None)
+_MODULE_TABLE: Dict[str, tuple] = {}
+
+
+class _LazyPluginProxy:
+    """Stands in for a built-in plugin export until the plugin is first used."""
+
+    __slots__ = ('evaluator', 'plugin_name', 'name')
+
+    def __init__(self, evaluator: "SafeEvaluator", plugin_name: str, name: str) -> None:
+        self.evaluator = evaluator
+        self.plugin_name = plugin_name
+        self.name = name
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.evaluator._activate_plugin(self.plugin_name)[self.name](*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<lazy {self.plugin_name}.{self.name}>"
+
+
+# Shared helper layer, built once per process and never written to by scripts:
+# each evaluator gets a flat copy as its __builtins__ (a read-only proxy would
+# take CPython's slow global-lookup path), so name lookups fall through to it
+# while user state lives in the per-instance env
+_started = time.perf_counter()
+_HELPERS: Dict[str, Any] = _build_reversed_helpers()
+STARTUP_TIMINGS["helper table"] = (time.perf_counter() - _started) * 1000
+REVERSED_HELPERS = MappingProxyType(_HELPERS)
+
+
+class RunResult:
+    """What SafeEvaluator.run_source did: captured output, last value, error and timing."""
+
+    def __init__(self) -> None:
+        self.stdout: Optional[str] = None  # None when output was not captured
+        self.stderr: Optional[str] = None
+        self.value: Any = None  # value of the last top-level expression statement
+        self.error: Optional[str] = None
+        self.compile_ms = 0.0  # parse/validate/compile, or program cache lookup
+        self.run_ms = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        return (f"RunResult(ok={self.ok}, value={self.value!r}, error={self.error!r}, "
+                f"compile_ms={self.compile_ms:.3f}, run_ms={self.run_ms:.3f})")
 
 
 class SafeEvaluator:
     """Advanced sandbox with 160+ reversed Python functions (Turing-complete)."""
 
-    def __init__(self) -> None:
-        self.env: Dict[str, Any] = {}
+    def __init__(self, cache_size: int = CODE_CACHE_SIZE, optimize: int = 0, memoize_pure: bool = False,
+                 safe_methods: bool = False) -> None:
+        # One live namespace: passed straight to eval/exec as globals, so
+        # user functions see later definitions without per-call copies. A
+        # private copy of the shared helper table sits underneath it as
+        # __builtins__, so scripts that reach it cannot change other evaluators.
+        self.env: Dict[str, Any] = {'__builtins__': dict(_HELPERS)}
         self.modules: Dict[str, Dict[str, Any]] = {}
         self.plugins: Dict[str, Callable] = {}
         self.user_functions: Dict[str, Dict[str, Any]] = {}
@@ -99,10 +1857,30 @@ class SafeEvaluator:
         self.loaded_plugins: Dict[str, Dict[str, Any]] = {}
         self._package_plugins: Dict[str, Dict[str, Any]] = {}  # name -> package meta (jvavpkg)
         self._input_provider: Callable[[str], str] = input
-        self._install_reversed_helpers()
-        self._install_extended_stdlib()
+        self.script_dir: Optional[Path] = None  # directory of the file being run, searched by import
+        self.optimize = optimize  # -O level: 1 inlines helper calls, 2 also folds and hoists
+        self.memoize_pure = memoize_pure
+        self.safe_methods = safe_methods  # obj.method(...) calls on whitelisted built-in types
+        self.memoized: Dict[str, Callable] = {}  # name -> memoized wrapper (--memoize-pure)
+        self._memo_dependents: Dict[str, set] = {}  # user function -> memoized functions calling it
+        self._optimized_defs: Dict[str, tuple] = {}  # name -> (function, assumed, helpers, source) under -O
+        self._code_cache = _CodeCache(cache_size)
+        self._last_result: Any = None  # last value echoed by eval_many
+        self._show_results = True
+        # Where tnirp, echoed results and evaluator messages go; None: the
+        # process's sys.stdout / sys.stderr at the time of writing
+        self.stdout: Optional[TextIO] = None
+        self.stderr: Optional[TextIO] = None
+        self.startup_timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        self._install_instance_helpers()
+        self.startup_timings["instance helpers"] = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
         self._load_builtin_plugins()
+        self.startup_timings["plugin load"] = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
         self._discover_package_plugins()
+        self.startup_timings["package discovery"] = (time.perf_counter() - started) * 1000
 
     def _package_roots(self) -> List[Path]:
         """Locations where jvavpkg installs packages (global + project-local)."""
@@ -116,207 +1894,505 @@ class SafeEvaluator:
         return roots
 
     def _discover_package_plugins(self) -> None:
-        """Register packages installed by jvavpkg (library/plugin) as loadable plugins."""
+        """Register packages installed by jvavpkg (library/plugin) as loadable plugins.
+
+        Each root's index.json (maintained by jvavpkg) is used when it is
+        current; otherwise the root's package directories are scanned.
+        """
         for root in self._package_roots():
-            for pkg_dir in root.iterdir():
-                if not pkg_dir.is_dir():
-                    continue
-                pkg_name = pkg_dir.name
-                manifest = None
-                mf_path = pkg_dir / "manifest.json"
-                if mf_path.exists():
-                    try:
-                        manifest = json.loads(mf_path.read_text(encoding="utf-8"))
-                    except (json.JSONDecodeError, OSError):
-                        manifest = None
-                pkg_type = (manifest or {}).get("type", "library")
-                if pkg_type not in ("library", "plugin"):
-                    continue
-                src_dir = pkg_dir / "src"
-                if not src_dir.is_dir() or not any(src_dir.iterdir()):
+            if not self._discover_from_index(root):
+                self._scan_package_root(root)
+
+    def _discover_from_index(self, root: Path) -> bool:
+        """Register packages from ``root/index.json``; False if missing or stale.
+
+        The index is stale when the package directories (ignoring the
+        __jvavcache__ of modules kept in the root) differ from its
+        entries, or when a package directory or its manifest.json was
+        modified after the index was written. The src directories are not
+        checked: loading a package writes its __jvavcache__ there.
+        """
+        index_path = root / PACKAGE_INDEX_FILE
+        try:
+            index_mtime = index_path.stat().st_mtime_ns
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+            with os.scandir(root) as entries:
+                dir_names = {entry.name for entry in entries
+                             if entry.is_dir() and entry.name != JVAVCACHE_DIR}
+        except (OSError, json.JSONDecodeError):
+            return False
+        if not isinstance(index, dict) or index.get("version") != PACKAGE_INDEX_VERSION:
+            return False
+        packages = index.get("packages")
+        if not isinstance(packages, dict) or set(packages) != dir_names:
+            return False
+        if not all(isinstance(entry, dict) for entry in packages.values()):
+            return False
+        for pkg_name in packages:
+            pkg_dir = root / pkg_name
+            for path in (pkg_dir, pkg_dir / "manifest.json"):
+                try:
+                    if path.stat().st_mtime_ns > index_mtime:
+                        return False
+                except FileNotFoundError:
                     continue
-                self._package_plugins[pkg_name] = {
-                    "root": root,
-                    "dir": pkg_dir,
-                    "src": src_dir,
-                    "manifest": manifest or {},
-                }
+                except OSError:
+                    return False
+        for pkg_name, entry in packages.items():
+            pkg_type = entry.get("type", "library")
+            if pkg_type not in ("library", "plugin") or not entry.get("src"):
+                continue
+            self._package_plugins[pkg_name] = {
+                "root": root,
+                "dir": root / pkg_name,
+                "src": root / entry["src"],
+                "manifest": {"name": pkg_name, "type": pkg_type},
+            }
+        return True
+
+    def _scan_package_root(self, root: Path) -> None:
+        """Register packages by reading every manifest under ``root`` (no index)."""
+        for pkg_dir in root.iterdir():
+            if not pkg_dir.is_dir() or pkg_dir.name == JVAVCACHE_DIR:
+                continue
+            pkg_name = pkg_dir.name
+            manifest = None
+            mf_path = pkg_dir / "manifest.json"
+            if mf_path.exists():
+                try:
+                    manifest = json.loads(mf_path.read_text(encoding="utf-8"))
+                except (json.JSONDecodeError, OSError):
+                    manifest = None
+            pkg_type = (manifest or {}).get("type", "library")
+            if pkg_type not in ("library", "plugin"):
+                continue
+            src_dir = pkg_dir / "src"
+            if not src_dir.is_dir() or not any(src_dir.iterdir()):
+                continue
+            self._package_plugins[pkg_name] = {
+                "root": root,
+                "dir": pkg_dir,
+                "src": src_dir,
+                "manifest": manifest or {},
+            }
+
+    def _package_module(self, pkg_name: str) -> Optional["_PackageModule"]:
+        """The (lazily loaded) module namespace of an installed package, cached per evaluator."""
+        module = self.modules.get(pkg_name)
+        if isinstance(module, _PackageModule):
+            return module
+        if pkg_name not in self._package_plugins:
+            return None
+        module = self.modules[pkg_name] = _PackageModule(self, pkg_name)
+        return module
+
+    def _exec_package(self, pkg_name: str) -> Dict[str, Any]:
+        """Run a package's src/*.jvav files in an isolated namespace; return what they bind."""
+        src_dir = self._package_plugins[pkg_name]["src"]
+        namespace = self._module_namespace()
+        exported: Dict[str, None] = {}
+        for src_file in sorted(src_dir.glob("*.jvav")):
+            entry = self._compile_source_file(src_file.read_text(encoding="utf-8"), src_file, str(src_file))
+            if entry is None:
+                continue
+            code, bound = entry
+            exec(code, namespace)
+            exported.update(dict.fromkeys(bound))
+        return {name: namespace[name] for name in exported if name in namespace}
+
+    def _module_namespace(self) -> Dict[str, Any]:
+        """Fresh globals for a package or user module: helpers, tupni, tnirp, loaded built-in plugins."""
+        namespace: Dict[str, Any] = {'__builtins__': self.env['__builtins__'], 'tupni': self.env.get('tupni'),
+                                     'tnirp': self.env.get('tnirp'),
+                                     IMPORT_HOOK: self.env.get(IMPORT_HOOK), HOIST_HOOK: _hoisted_call,
+                                     MEMOIZE_HOOK: self._memoize_hook, OPTIMIZED_HOOK: self._optimized_hook,
+                                     METHOD_HOOK: _call_method, METHODS_HOOK: _METHOD_TYPES,
+                                     TYPE_HOOK: type, TAIL_HOOK: _is_running}
+        for plugin_name, table in self.loaded_plugins.items():
+            if plugin_name in self.plugins:
+                namespace.update(table)
+        return namespace
+
+    def _module_search_path(self) -> List[Path]:
+        """Directories searched for ``<name>.jvav``: the script's, the project (cwd), package roots."""
+        dirs: List[Path] = []
+        if self.script_dir is not None:
+            dirs.append(self.script_dir)
+        cwd = Path.cwd()
+        if cwd not in dirs:
+            dirs.append(cwd)
+        dirs.extend(self._package_roots())
+        return dirs
+
+    def _find_module_file(self, module_name: str) -> Optional[tuple]:
+        """Return ``(path, mtime_ns)`` of the first ``<module_name>.jvav`` on the search path."""
+        if not module_name.isidentifier():
+            return None
+        for directory in self._module_search_path():
+            path = directory / f"{module_name}.jvav"
+            try:
+                return path.resolve(), path.stat().st_mtime_ns
+            except OSError:
+                continue
+        return None
+
+    def _load_file_module(self, module_name: str, path: Path, mtime_ns: int) -> "_FileModule":
+        """Run a user module in its own namespace, compiling it at most once per process and mtime."""
+        key = (str(path), self._compile_options())
+        entry = _MODULE_TABLE.get(key)
+        if entry is None or entry[0] != mtime_ns:
+            compiled = self._compile_source_file(path.read_text(encoding="utf-8"), path, str(path))
+            entry = _MODULE_TABLE[key] = (mtime_ns, compiled)
+        module = self.modules[module_name] = _FileModule({}, path, mtime_ns)
+        if entry[1] is None:
+            return module
+        code, bound = entry[1]
+        namespace = self._module_namespace()
+        try:
+            exec(code, namespace)
+        except BaseException:
+            del self.modules[module_name]
+            raise
+        module.update((name, namespace[name]) for name in bound if name in namespace)
+        return module
+
+    def _import_hook(self, module_name: str, names: Optional[tuple] = None) -> Any:
+        """Target of import statements in files (installed as ``__jvav_import__``).
+
+        Returns the module, or the values of ``names`` for ``from ... import``.
+        """
+        module = self._resolve_module(module_name)
+        if module is None:
+            raise ImportError(f"Module '{module_name}' not found")
+        if names is None:
+            return module
+        values = []
+        for name in names:
+            if name not in module:
+                raise ImportError(f"Name '{name}' not found in module '{module_name}'")
+            values.append(module[name])
+        return tuple(values)
 
     def _load_package_plugin(self, plugin_name: str) -> bool:
-        """Load a jvavpkg-installed library/plugin from its src/*.jvav files."""
-        meta = self._package_plugins.get(plugin_name)
-        if not meta:
+        """Load a jvavpkg-installed library/plugin: merge its module's names into env."""
+        module = self._package_module(plugin_name)
+        if module is None:
             return False
-        src_dir = meta["src"]
-        loaded_names: List[str] = []
         try:
-            for src_file in sorted(src_dir.glob("*.jvav")):
-                raw_lines = src_file.read_text(encoding="utf-8").splitlines()
-                lines = _preprocess_lines(raw_lines)
-                complete_code = "\n".join(lines)
-                if not complete_code.strip():
-                    continue
-                node = ast.parse(complete_code, mode="exec")
-                self._validate_ast(node, mode="exec")
-                globals_dict = {"__builtins__": {}}
-                globals_dict.update(self.env)
-                exec(compile(node, str(src_file), "exec"), globals_dict, globals_dict)
-                for key, value in globals_dict.items():
-                    if key != "__builtins__" and not key.startswith("__"):
-                        if key not in self.env or self.env.get(key) != value:
-                            loaded_names.append(key)
-                        self.env[key] = value
-            self.loaded_plugins[plugin_name] = {"__pkg__": True, "names": loaded_names}
-            return True
+            module.load()
         except Exception as exc:
-            print(f"[error] Failed to load package plugin {plugin_name}: {exc}")
+            print(f"[error] Failed to load package plugin {plugin_name}: {exc}", file=self.stdout)
             return False
+        self.env.update(module)
+        self.loaded_plugins[plugin_name] = {"__pkg__": True, "names": list(module)}
+        return True
 
-    def _load_builtin_plugins(self) -> None:
-        """Load built-in plugins."""
-        self.plugins['file_ops'] = self._create_file_plugin()
-        self.plugins['network'] = self._create_network_plugin()
-        self.plugins['datetime'] = self._create_datetime_plugin()
-        self.plugins['math_ext'] = self._create_math_plugin()
-        self.plugins['console'] = self._create_console_plugin()
-        self.plugins['system'] = self._create_system_plugin()
-        self.plugins['collections'] = self._create_collections_plugin()
-        
-        for plugin_name in ['file_ops', 'datetime', 'math_ext', 'console', 'collections']:
-            self.load_plugin(plugin_name)
+    def _compile_source_file(self, source: str, src_path: Optional[Path], filename: str,
+                             echo: bool = False) -> Optional[tuple]:
+        """Preprocess, validate and compile a .jvav source, reusing __jvavcache__ when unchanged.
+
+        Sources without a ``src_path`` (-c programs, REPL blocks, run_source)
+        are kept in the process-wide program cache instead. With ``echo``, top-level expression
+        statements go through the echo hook. Returns ``(code, bound_names)``,
+        or None for sources with no code after preprocessing.
+        """
+        if src_path is None:
+            key = (source, filename, echo, self._compile_options())
+            cached = self._cached_code(key, _PROGRAM_CACHE)
+            if cached is not None:
+                return cached
+        else:
+            cache_path = _jvavcache_path(src_path)
+            key = _jvavcache_key(source, filename, (*self._compile_options(), echo))
+            entry = _read_jvavcache(cache_path, key)
+            if entry is not None and not self._assumptions_broken(entry[2]):
+                self._refresh_optimized(entry[0])
+                return entry[:2]
+        entry = self._compile_program(source, filename, echo)
+        if entry is None:
+            return None
+        if src_path is None:
+            _PROGRAM_CACHE.put(key, (entry[:2], entry[2]))
+        else:
+            _write_jvavcache(cache_path, key, entry)
+        return entry[:2]
+
+    def _compile_program(self, source: str, filename: str, echo: bool = False,
+                         whole_file: bool = True) -> Optional[tuple]:
+        """Preprocess, parse, validate and compile .jvav source; no caching.
+
+        Returns ``(code, bound_names, assumed)``, or None if no code is left
+        after preprocessing. Without ``whole_file`` (streamed statements) the
+        source may depend on code compiled separately: module-level names
+        are not hoisted and the validation verdict is not memoized.
+        """
+        complete_code = "\n".join(_preprocess_lines(source.split("\n")))
+        if not complete_code.strip():
+            return None
+        node = ast.parse(complete_code, mode="exec")
+        self._validate_ast(node, mode="exec", source=complete_code if whole_file else None, allow_imports=True)
+        node = _eliminate_tail_calls(_rewrite_imports(node))
+        bound = _bound_names(node)  # before -OO adds its hidden temporaries
+        if echo:
+            node = _echo_statements(node)
+        node, assumed = self._optimize_tree(node, whole_file=whole_file)
+        code = compile(node, filename, "exec")
+        self._refresh_optimized(code)
+        return code, bound, assumed
+
+    def _compile_options(self) -> tuple:
+        """Options that change the code compiled from a source (part of the cache keys)."""
+        return (self.optimize, self.memoize_pure, self.safe_methods)
+
+    def _optimize_tree(self, node: ast.AST, whole_file: bool = False,
+                       shadowing: frozenset = frozenset()) -> tuple:
+        """Apply the --safe-methods, --memoize-pure and -O passes to a validated tree.
+
+        Method calls are always compiled to guarded calls first. Level 1
+        inlines thin helpers; level 2 first folds pure calls on constants
+        and hoists loop invariants. Names bound anywhere in the tree, and
+        those in ``shadowing``, are left alone. Top-level defs optimized
+        under assumptions get the __jvav_optimized__ decorator, with their
+        unoptimized source. Returns ``(tree, assumed)``, the
+        ``(name, provider)`` bindings the compiled code relies on.
+        """
+        assumed: Dict[tuple, None] = {}
+        if self.optimize:
+            excluded = _all_bound_names(node) | shadowing
+            sources = {}
+            for stmt in node.body if isinstance(node, ast.Module) else ():
+                if isinstance(stmt, ast.FunctionDef):
+                    reads = {n.id for n in ast.walk(stmt) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)}
+                    if not (reads & _OPTIMIZED_CALLS) <= excluded:
+                        sources[stmt] = (reads, ast.unparse(stmt))
+        if self.safe_methods:
+            node = ast.fix_missing_locations(_MethodCalls().visit(node))
+        if self.memoize_pure and isinstance(node, ast.Module):
+            assumed.update(self._decorate_memoized(node))
+        if not self.optimize:
+            return node, tuple(assumed)
+        if self.optimize >= 2:
+            folder = _ConstantFolder(self, excluded)
+            node = folder.visit(node)
+            assumed.update(folder.assumed)
+            scoped = any(isinstance(n, (ast.Global, ast.Nonlocal)) for n in ast.walk(node))
+            if not scoped:
+                node = _LoopHoister(excluded, module_names=whole_file).visit(node)
+        inliner = _HelperInliner(excluded | {name for name in _INLINE_TEMPLATES if name in self.env})
+        node = inliner.visit(node)
+        assumed.update(dict.fromkeys((name, None) for name in inliner.inlined))
+        for stmt, (reads, source) in sources.items():
+            relied_on = tuple(pair for pair in assumed if pair[0] in reads and pair[0] in _OPTIMIZED_CALLS)
+            if relied_on:
+                hook = ast.Call(ast.Name(OPTIMIZED_HOOK, ast.Load()),
+                                [ast.Constant(stmt.name), ast.Constant(relied_on), ast.Constant(source)], [])
+                stmt.decorator_list.append(ast.copy_location(hook, stmt))
+        return ast.fix_missing_locations(node), tuple(assumed)
+
+    def _decorate_memoized(self, tree: ast.Module) -> Dict[tuple, None]:
+        """Put the __jvav_memoize__ decorator on every top-level def of ``tree``.
+
+        Pure functions get the user functions they call (re-checked when the
+        def runs) and the shared helpers they read; others get None, which
+        only records the redefinition. Returns the shared helpers the purity
+        verdicts assumed unshadowed.
+        """
+        known = {name for name, wrapper in self.memoized.items() if self.env.get(name) is wrapper}
+        shadowed = {name for name in set(_PURE_CALLS) | _MEMO_SAFE_CALLS if name in self.env}
+        pure = _pure_definitions(tree, known, shadowed)
+        assumed: Dict[tuple, None] = {}
+        for stmt in tree.body:
+            if not isinstance(stmt, ast.FunctionDef):
+                continue
+            callees = pure.get(stmt.name)
+            helpers: tuple = ()
+            if callees is not None:
+                helpers = tuple(sorted(name for name in _global_reads(stmt)
+                                       if name in _PURE_CALLS or name in _MEMO_SAFE_CALLS))
+                assumed.update(((name, None), None) for name in helpers)
+            hook = ast.Call(ast.Name(MEMOIZE_HOOK, ast.Load()),
+                            [ast.Constant(stmt.name), ast.Constant(callees), ast.Constant(helpers)], [])
+            stmt.decorator_list.insert(0, ast.copy_location(hook, stmt))
+        ast.fix_missing_locations(tree)
+        return assumed
+
+    def _memoize_hook(self, name: str, callees: Optional[tuple], helpers: tuple = ()) -> Callable:
+        """Decorator factory behind __jvav_memoize__ (--memoize-pure).
+
+        Memoizes a pure function defined in env when every user function it
+        calls is still memoized; any redefinition un-memoizes the old one.
+        So does a def or assignment shadowing one of the shared ``helpers``
+        it (or a memoized function it calls) reads, noticed on its next call.
+        """
+        def apply(func: Callable) -> Callable:
+            if getattr(func, "__globals__", None) is not self.env:
+                return func  # imported modules and packages are left alone
+            self._forget_memoized(name)
+            if callees is None or not all(callee in self.memoized and self.env.get(callee) is self.memoized[callee]
+                                          for callee in callees):
+                return func
+
+            def shadowed() -> None:
+                if self.memoized.get(name) is wrapper:
+                    self._forget_memoized(name)
+                    if self.env.get(name) is wrapper:
+                        self.env[name] = func
+
+            relied_on = frozenset(helpers).union(*(self.memoized[callee].helpers for callee in callees))
+            wrapper = self.memoized[name] = _memoized(func, helpers=relied_on, on_shadowed=shadowed)
+            for callee in callees:
+                self._memo_dependents.setdefault(callee, set()).add(name)
+            return wrapper
+        return apply
+
+    def _forget_memoized(self, name: str) -> None:
+        """``name`` is redefined or lost a helper: un-memoize it and the memoized functions calling it."""
+        if self.memoized.pop(name, None) is None:
+            return
+        for dependent in self._memo_dependents.pop(name, ()):
+            wrapper = self.memoized.get(dependent)
+            if wrapper is not None and self.env.get(dependent) is wrapper:
+                self.env[dependent] = wrapper.__wrapped__
+            self._forget_memoized(dependent)
+
+    def _optimized_hook(self, name: str, assumed: tuple, source: str) -> Callable:
+        """Decorator factory behind __jvav_optimized__ (-O): remember functions defined in env."""
+        helpers = _assumed_names(assumed)
+
+        def apply(func: Callable) -> Callable:
+            if getattr(func, "__globals__", None) is self.env:
+                self._optimized_defs[name] = (func, assumed, helpers, source)
+            return func
+        return apply
+
+    def _refresh_optimized(self, code: CodeType) -> None:
+        """Recompile -O functions whose helpers are shadowed in env or may be bound by ``code``.
+
+        Called with every code object about to run in env, so a def or
+        assignment shadowing a helper takes effect on earlier functions
+        before anything else runs.
+        """
+        if not self._optimized_defs:
+            return
+        names = _code_names(code)
+        stale = []
+        for name, (func, assumed, helpers, _) in self._optimized_defs.items():
+            current = self.env.get(name)
+            if current is not func and getattr(current, "__wrapped__", None) is not func:
+                stale.append((name, None))  # redefined since
+            elif not helpers.isdisjoint(names) or self._assumptions_broken(assumed):
+                stale.append((name, helpers & names))
+        for name, shadowing in stale:
+            func, _, _, source = self._optimized_defs.pop(name)
+            if shadowing is not None:
+                self._recompile_optimized(name, func, source, shadowing)
+
+    def _recompile_optimized(self, name: str, func: Callable, source: str, shadowing: frozenset) -> None:
+        """Give ``func`` the code of its unoptimized ``source``, optimized against the current env.
+
+        The function object is kept (defaults, references to it), only its
+        ``__code__`` is replaced.
+        """
+        tree = ast.parse(source)
+        ast.increment_lineno(tree, func.__code__.co_firstlineno - 1)
+        tree, _ = self._optimize_tree(tree, shadowing=shadowing)
+        module = compile(tree, func.__code__.co_filename, "exec")
+        func.__code__ = next(const for const in module.co_consts
+                             if isinstance(const, CodeType) and const.co_name == name)
+        for hook in tree.body[0].decorator_list:
+            if _is_optimized_hook(hook):
+                self._optimized_hook(name, hook.args[1].value, source)(func)
+
+    def _pure_target(self, name: str) -> Optional[Callable]:
+        """The pure function ``name`` resolves to in env, for folding; None if shadowed."""
+        if name not in _PURE_CALLS:
+            return None
+        provider = _PURE_CALLS[name]
+        if provider is None:
+            return None if name in self.env else _HELPERS[name]
+        if not _is_pure_function(name, self.env.get(name)):
+            return None
+        return _builtin_plugin_table(provider)[name]
 
-    def _create_file_plugin(self) -> Callable:
-        """File operations plugin."""
-        def file_plugin():
-            return {
-                'daeRelif': lambda path: Path(path).read_text(encoding='utf-8'),
-                'etirWelif': lambda path, content: Path(path).write_text(content, encoding='utf-8'),
-                'stsilD': lambda path='.': [f.name for f in Path(path).iterdir() if f.is_file()],
-                'stsilDrekrowt': lambda path='.': [f.name for f in Path(path).iterdir() if f.is_dir()],
-                'emantsixe': lambda path: Path(path).exists(),
-                'etaercD': lambda path: Path(path).mkdir(parents=True, exist_ok=True),
-                'eteleD': lambda path: Path(path).unlink() if Path(path).is_file() else None,
-            }
-        return file_plugin
+    def _assumptions_broken(self, assumed: tuple) -> bool:
+        """True if a binding that optimized code relied on has since changed in env."""
+        for name, provider in assumed:
+            if provider is None and name in self.env:
+                return True
+            if provider is not None and not _is_pure_function(name, self.env.get(name)):
+                return True
+        return False
 
-    def _create_network_plugin(self) -> Callable:
-        """Network operations plugin."""
-        def network_plugin():
-            def http_get(url: str) -> str:
-                try:
-                    with urllib.request.urlopen(url, timeout=10) as response:
-                        return response.read().decode('utf-8')
-                except Exception as e:
-                    return f"Network error: {e}"
+    def _cached_code(self, key: Any, cache: Optional[_CodeCache] = None) -> Any:
+        """Code cache lookup; entries optimized under bindings that changed are recompiled."""
+        cached = (self._code_cache if cache is None else cache).get(key)
+        if cached is None or self._assumptions_broken(cached[1]):
+            return None
+        self._refresh_optimized(cached[0][0])
+        return cached[0]
+
+    def optimized_source(self, source: str) -> str:
+        """The .jvav ``source`` as the Python code it compiles to, after the -O passes.
+
+        The __jvav_optimized__ decorators, which carry the unoptimized
+        source of their functions, are left out.
+        """
+        complete_code = "\n".join(_preprocess_lines(source.split("\n")))
+        node = ast.parse(complete_code, mode="exec")
+        self._validate_ast(node, mode="exec", source=complete_code, allow_imports=True)
+        node, _ = self._optimize_tree(_eliminate_tail_calls(_rewrite_imports(node)), whole_file=True)
+        for stmt in node.body:
+            if isinstance(stmt, ast.FunctionDef):
+                stmt.decorator_list = [hook for hook in stmt.decorator_list if not _is_optimized_hook(hook)]
+        return ast.unparse(node)
 
-            def http_post(url: str, data: Dict[str, Any]) -> str:
-                try:
-                    post_data = urllib.parse.urlencode(data).encode('utf-8')
-                    req = urllib.request.Request(url, data=post_data)
-                    with urllib.request.urlopen(req, timeout=10) as response:
-                        return response.read().decode('utf-8')
-                except Exception as e:
-                    return f"Network error: {e}"
-
-            return {
-                'teGptth': http_get,
-                'tsoPptth': http_post,
-                'sdaolnosj': lambda s: json.loads(s),
-                'smpudnosj': lambda o: json.dumps(o, ensure_ascii=False),
-                'edocnelurU': lambda s: urllib.parse.urlencode(dict([tuple(x.split('=')) for x in s.split('&')])) if '&' in s else s,
-            }
-        return network_plugin
-
-    def _create_datetime_plugin(self) -> Callable:
-        """DateTime operations plugin."""
-        def datetime_plugin():
-            return {
-                'emitwon': lambda: datetime.now(),
-                'etadwon': lambda: date.today(),
-                'stamptime': lambda: time.time(),
-                'eeps': lambda secs: time.sleep(secs),
-                'sffats': lambda: time.strftime('%Y-%m-%d %H:%M:%S'),
-            }
-        return datetime_plugin
-
-    def _create_math_plugin(self) -> Callable:
-        """Extended math operations plugin."""
-        def math_plugin():
-            return {
-                'ip': lambda: math.pi,
-                'e': lambda: math.e,
-                'qes': lambda x: math.sqrt(x),
-                'gif': lambda x: math.sin(x),
-                'soc': lambda x: math.cos(x),
-                'nat': lambda x: math.tan(x),
-                'gol': lambda x, base=math.e: math.log(x, base),
-                'dome': lambda x: math.exp(x),
-                'eliforp': lambda x: math.factorial(x),
-                'ceils': lambda x: math.ceil(x),
-                'roolf': lambda x: math.floor(x),
-                'modnar': lambda a=0.0, b=1.0: random.uniform(a, b),
-                'modnarwen': lambda: random.random(),
-                'modnartegrat': lambda a, b: random.randint(a, b),
-            }
-        return math_plugin
+    def _load_builtin_plugins(self) -> None:
+        """Load built-in plugins (tables are built once per process and shared).
 
-    def _create_console_plugin(self) -> Callable:
-        """Console plugin."""
-        def console_plugin():
-            try:
-                import msvcrt
-                return {
-                    'cls': lambda: os.system('cls'),
-                    'put': lambda s: print(s, end='', flush=True),
-                }
-            except:
-                return {
-                    'cls': lambda: os.system('clear'),
-                    'put': lambda s: print(s, end='', flush=True),
-                }
-        return console_plugin
-
-    def _create_system_plugin(self) -> Callable:
-        """System operations plugin."""
-        def system_plugin():
-            def run_command(cmd: str, timeout: int = 30) -> Dict[str, Any]:
-                try:
-                    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
-                    return {'tuptuo': result.stdout, 'rorre': result.stderr, 'edoc': result.returncode}
-                except Exception as e:
-                    return {'rorre': str(e), 'edoc': -1}
-            return {
-                'dnammoCnur': run_command,
-                'hctaPwen': os.getcwd,
-                'hctaPegnahc': os.chdir,
-            }
-        return system_plugin
-
-    def _create_collections_plugin(self) -> Callable:
-        """Collections and data structures plugin."""
-        def collections_plugin():
-            return {
-                'retnuoC': Counter,
-                'euqed': deque,
-                'tluafedtlefD': defaultdict,
-                'deredroD': OrderedDict,
-            }
-        return collections_plugin
+        console is the exception: its ``put`` writes to this evaluator's stdout.
+        """
+        for plugin_name in _BUILTIN_PLUGIN_FACTORIES:
+            self.plugins[plugin_name] = functools.partial(_builtin_plugin_table, plugin_name)
+        self.plugins['console'] = self._console_table
+
+        for plugin_name in DEFAULT_PLUGINS:
+            self.load_plugin(plugin_name)
+
+    def _console_table(self) -> Dict[str, Any]:
+        """The console plugin's table with ``put`` bound to this evaluator."""
+        table = dict(_builtin_plugin_table('console'))
+        table['put'] = self._put
+        return table
 
     def load_plugin(self, plugin_name: str) -> bool:
         """Load a plugin by name (built-in or jvavpkg-installed package)."""
         if plugin_name in self.plugins:
             try:
-                plugin_functions = self.plugins[plugin_name]()
+                exports = _LAZY_PLUGIN_EXPORTS.get(plugin_name)
+                if exports is not None and plugin_name not in _PLUGIN_TABLES:
+                    plugin_functions = {name: _LazyPluginProxy(self, plugin_name, name) for name in exports}
+                else:
+                    plugin_functions = self.plugins[plugin_name]()
                 self.loaded_plugins[plugin_name] = plugin_functions
                 self.env.update(plugin_functions)
                 return True
             except Exception as e:
-                print(f"[error] Failed to load plugin {plugin_name}: {e}")
+                print(f"[error] Failed to load plugin {plugin_name}: {e}", file=self.stdout)
                 return False
         # Fall back to packages installed by jvavpkg
         return self._load_package_plugin(plugin_name)
 
+    def _activate_plugin(self, plugin_name: str) -> Any:
+        """Materialize a lazily loaded plugin, replacing its proxies in env."""
+        table = self.plugins[plugin_name]()
+        if plugin_name in self.loaded_plugins:
+            self.loaded_plugins[plugin_name] = table
+            for name, value in table.items():
+                current = self.env.get(name)
+                if isinstance(current, _LazyPluginProxy) and current.plugin_name == plugin_name:
+                    self.env[name] = value
+        return table
+
     def unload_plugin(self, plugin_name: str) -> bool:
         """Unload a plugin by name (built-in or package)."""
         if plugin_name not in self.loaded_plugins:
@@ -343,269 +2419,99 @@ class SafeEvaluator:
         """List currently loaded plugins."""
         return list(self.loaded_plugins.keys())
 
-    def _install_reversed_helpers(self) -> None:
-        """Install 160+ reversed Python builtins for Turing-completeness."""
-        # Core I/O (5)
-        helpers = {
-            "tnirp": print,
-            "tupni": lambda prompt="": self._input_provider(prompt),
-            "tnemhdac": chr,
-            "nepo": open,
-            "esolc": lambda f: f.close() if hasattr(f, 'close') else None,
-        }
+    def _install_instance_helpers(self) -> None:
+        """Install the helpers bound to this evaluator on top of the shared table."""
+        self.env["tupni"] = lambda prompt="": self._input_provider(prompt)
+        self.env["tnirp"] = self._print
+        self.env[IMPORT_HOOK] = self._import_hook
+        self.env[HOIST_HOOK] = _hoisted_call
+        self.env[MEMOIZE_HOOK] = self._memoize_hook
+        self.env[OPTIMIZED_HOOK] = self._optimized_hook
+        self.env[ECHO_HOOK] = self._echo_hook
+        self.env[METHOD_HOOK] = _call_method
+        self.env[METHODS_HOOK] = _METHOD_TYPES
+        self.env[TYPE_HOOK] = type
+        self.env[TAIL_HOOK] = _is_running
+
+    def _print(self, *args: Any, **kwargs: Any) -> None:
+        """tnirp bound to this evaluator: writes to ``self.stdout``."""
+        kwargs.setdefault("file", self.stdout)
+        print(*args, **kwargs)
+
+    def _put(self, s: Any) -> None:
+        """console's put bound to this evaluator: writes to ``self.stdout`` without a newline."""
+        print(s, end='', flush=True, file=self.stdout)
+
+    def reset(self) -> None:
+        """Forget everything scripts did: fresh namespace, helper layer, modules and default plugins.
+
+        Options, caches, discovered packages and the input provider are kept.
+        """
+        self.env = {'__builtins__': dict(_HELPERS)}
+        self.modules.clear()
+        self.user_functions.clear()
+        self.user_classes.clear()
+        self.loaded_plugins.clear()
+        self.memoized.clear()
+        self._memo_dependents.clear()
+        self._optimized_defs.clear()
+        self.script_dir = None
+        self._install_instance_helpers()
+        self.set_input_provider(self._input_provider)
+        for plugin_name in DEFAULT_PLUGINS:
+            self.load_plugin(plugin_name)
 
-        # Type conversions (10)
-        helpers.update({
-            "tni": int,
-            "taolf": float,
-            "rts": str,
-            "loob": bool,
-            "tsal": list,
-            "elpot": tuple,
-            "tes": set,
-            "tcid": dict,
-            "xetebmoc": complex,
-            "stey": bytes,
-        })
-
-        # Container operations (25)
-        helpers.update({
-            "nel": len,
-            "dneppa": lambda lst, x: lst.append(x),
-            "dnetxe": lambda lst, x: lst.extend(x),
-            "tresni": lambda lst, i, x: lst.insert(i, x),
-            "evormer": lambda lst, x: lst.remove(x),
-            "pop": lambda lst, i=-1: lst.pop(i),
-            "raelc": lambda c: c.clear(),
-            "ypoC": lambda c: c.copy(),
-            "tros": lambda lst, key=None, reverse=False: lst.sort(key=key, reverse=reverse),
-            "detros": sorted,
-            "desrever": reversed,
-            "esrever": lambda lst: lst.reverse(),
-            "xedni": lambda lst, x, start=0, end=None: lst.index(x, start, end if end else len(lst)),
-            "tnuoc": lambda lst, x: lst.count(x),
-            "tsal_": lambda d: list(d.keys()) if isinstance(d, dict) else None,
-            "seulav": lambda d: list(d.values()) if isinstance(d, dict) else None,
-            "smetsi": lambda d: list(d.items()) if isinstance(d, dict) else None,
-            "teg": lambda d, k, default=None: d.get(k, default) if isinstance(d, dict) else None,
-            "tup": lambda d, k, v: d.__setitem__(k, v),
-            "pop_": lambda d, k, default=None: d.pop(k, default) if isinstance(d, dict) else None,
-            "etupda": lambda d, other: d.update(other),
-            "tnemtupni": lambda k, v: {k: v},
-            "ypocerid": lambda d: dict(d),
-            "syek": lambda d: list(d.keys()) if isinstance(d, dict) else None,
-            "hanem": lambda obj, name: hasattr(obj, name),
-            "teg_": lambda obj, name, default=None: getattr(obj, name, default),
-        })
-
-        # Math operations (30)
-        helpers.update({
-            "mus": sum,
-            "xam": max,
-            "nim": min,
-            "sba": abs,
-            "dnuor": round,
-            "wop": pow,
-            "nib": bin,
-            "xeh": hex,
-            "tco": oct,
-            "dro": ord,
-            "rhc": chr,
-            "diD": divmod,
-            "dom": lambda a, b: a % b,
-            "gniht_": operator.add,
-            "evresid": operator.sub,
-            "eitivlum": operator.mul,
-            "edivid": operator.truediv,
-            "floof_": operator.floordiv,
-            "dna": operator.and_,
-            "ro": operator.or_,
-            "ton_": operator.not_,
-            "rox": operator.xor,
-            "dftelsil": operator.lshift,
-            "thgilsr": operator.rshift,
-            "eq": operator.eq,
-            "en": operator.ne,
-            "tl": operator.lt,
-            "et": operator.le,
-            "tg": operator.gt,
-            "eg": operator.ge,
-            "gniht_ni": operator.contains,
-        })
-
-        # String operations (20)
-        helpers.update({
-            "nioj": lambda sep, lst: sep.join(str(x) for x in lst),
-            "tlihs": lambda s, sep=None: s.split(sep),
-            "pirts": lambda s: s.strip(),
-            "tfel_pirts": lambda s: s.lstrip(),
-            "thgir_pirts": lambda s: s.rstrip(),
-            "reppu": lambda s: s.upper(),
-            "rewol": lambda s: s.lower(),
-            "epac_": lambda s: s.capitalize(),
-            "esilcaeltwit": lambda s: s.title(),
-            "swapS": lambda s: s.swapcase(),
-            "ecalper": lambda s, old, new: s.replace(old, new),
-            "dnif": lambda s, sub: s.find(sub),
-            "fni": lambda s, sub: sub in s,
-            "egakcorP_": lambda s, sep=None: s.rsplit(sep),
-            "niatsnoC": lambda s, sub: sub in s,
-            "strats_": lambda s, pre: s.startswith(pre),
-            "sdn_": lambda s, suf: s.endswith(suf),
-            "esrever_": lambda s: s[::-1],
-            "dap": lambda s, width, char=' ': s.ljust(width, char),
-            "redneC": lambda s, width: s.center(width),
-        })
-
-        # Logic/comparison (12)
-        helpers.update({
-            "lla": all,
-            "yna": any,
-            "refilF": filter,
-            "paM": map,
-            "ecuder": functools.reduce,
-            "pocE": lambda iterable, start=0: enumerate(iterable, start),
-            "piz": zip,
-            "niahloot_": itertools.chain,
-            "tnemituc": itertools.combinations,
-            "noitamrep": itertools.permutations,
-            "trop_": itertools.repeat,
-            "rekam": lambda x: iter(x),
-        })
-
-                # Iterator/generator helpers (15)
-        helpers.update({
-            "egnar": range,
-            "elpot_": tuple,
-            "tes_": set,
-            "tcid_": dict,
-            "detros_": sorted,
-            "detaehc": iter,
-            "txen": next,
-            "ylppa": lambda f, args: f(*args),
-            "labmaz": lambda *args: lambda x: all(arg(x) for arg in args),
-            "etaerc_eulav": lambda f: (lambda *a, **kw: f(*a, **kw)),
-            "latrap": functools.partial,
-            "evruc": lambda f: functools.wraps(f),
-            "ekam_ssal": lambda name, bases, dict_: type(name, bases, dict_),
-        })
-
-        # Type checking (15)
-        helpers.update({
-            "epyt": type,
-            "ecnatsni": isinstance,
-            "rttah": hasattr,
-            "rttag": getattr,
-            "rttas": setattr,
-            "lleD": delattr,
-            "elobisca": callable,
-            "detamixa": isinstance,
-            "si_": lambda x, y: x is y,
-            "ton_si": lambda x, y: x is not y,
-            "edoR": repr,
-            "lciA": ascii,
-            "dir": dir,
-            "seosrcni": vars,
-            "secruos": inspect.getsource if hasattr(inspect, 'getsource') else lambda x: "N/A",
-        })
-
-        # Bit operations (8)
-        helpers.update({
-            "tfel_tfihs": lambda x, n: x << n,
-            "thgir_tfihs": lambda x, n: x >> n,
-            "dna_": lambda x, y: x & y,
-            "ro_": lambda x, y: x | y,
-            "xor_": lambda x, y: x ^ y,
-            "ton_": lambda x: ~x,
-            "etageltsbI": lambda x: x.bit_length(),
-            "tnuoc_stib": lambda x: bin(x).count('1'),
-        })
-
-        # Conversion helpers (12)
-        helpers.update({
-            "426esab_": lambda s: base64.b64encode(s.encode()).decode(),
-            "426esab_": lambda s: base64.b64decode(s).decode(),
-            "xeh_": lambda s: s.encode().hex(),
-            "morf_xeh": lambda h: bytes.fromhex(h).decode(),
-            "idA": ascii,
-            "valE": eval,
-            "xecE": exec,
-            "teipmoc": compile,
-            "thpiclas": lambda code: compile(code, '<string>', 'exec'),
-            "hslif": lambda code: compile(code, '<string>', 'eval'),
-            "slas": lambda obj: vars(obj) if hasattr(obj, '__dict__') else {},
-            "stlbui": lambda: {"safe": "builtins"},  # Safe stub for PyInstaller compatibility
-        })
-
-        # Sequence operations (15)
-        helpers.update({
-            "detaelnoc": lambda lst: [item for sublist in lst for item in sublist],
-            "tniop_yrrA": lambda *args: list(args),
-            "rezif": zip,
-            "ezif": lambda *args: list(zip(*args)),
-            "ecilS": lambda seq, start, end, step=1: seq[start:end:step],
-            "teseR": lambda lst: lst.clear(),
-            "ypoC_peed": lambda lst: [x.copy() if isinstance(x, (list, dict)) else x for x in lst],
-            "dedda_": lambda lst, x: lst + [x],
-            "devomer_": lambda lst, x: [item for item in lst if item != x],
-            "deifuqinu_": lambda lst: list(dict.fromkeys(lst)),
-            "detrop_": lambda lst: sorted(lst),
-            "desrever_": lambda lst: list(reversed(lst)),
-            "eriuqsid": lambda lst: list(set(lst)),
-            "egarevA": statistics.mean,
-            "naideyM": statistics.median,
-        })
-
-        # Advanced (20)
-        helpers.update({
-            "etaer_": itertools.repeat,
-            "etaer_ecniF": itertools.repeat,
-            "gnikac": functools.lru_cache,
-            "thcaw": lambda f: f,
-            "ledoM": lambda obj: getattr(obj, '__module__', 'unknown'),
-            "emanN": lambda obj: getattr(obj, '__name__', 'unknown'),
-            "cobD": lambda obj: getattr(obj, '__doc__', 'N/A'),
-            "ttirbAtta": lambda obj: getattr(obj, '__dict__', {}),
-            "saeB": lambda obj: getattr(obj, '__bases__', ()),
-            "REM": lambda obj: getattr(obj, '__mro__', []),
-            "ytiruseC": lambda code: ast.parse(code),
-            "thgniL": lambda code: ast.dump(ast.parse(code)),
-            "ecnatsnI_werN": lambda cls, *args, **kw: cls(*args, **kw),
-            "lausiV": repr,
-            "eripxE": lambda x, timeout=1: x,
-            "knahT": lambda: "🙏",
-            "trawdnU": lambda x: x,
-            "esoporP": lambda x: x,
-            "Eriw": lambda x: x,
-            "seY": lambda: True,
-        })
-
-        # Reversed boolean constants
-        helpers.update({
-            "eurT": True,
-            "eslaF": False,
-        })
-
-        self.env.update(helpers)
-
-    def _install_extended_stdlib(self) -> None:
-        """Install additional standard library functions."""
-        def help_func(obj=None):
-            """Simple help function."""
-            if obj is None:
-                return "JVAV DK27 - Turing-complete brainwave programming language with 160+ reversed functions"
-            return f"Object: {obj}"
-        
-        extended = {
-            "nel": len,
-            "ecnatsni": isinstance,
-            "rttah": hasattr,
-            "rttag": getattr,
-            "rttas": setattr,
-            "rid": dir,
-            "pleh": help_func,
-        }
-        self.env.update(extended)
+    def run_source(self, source: str, inputs: Optional[Iterable[str]] = (), capture: bool = True,
+                   reuse_env: bool = True) -> "RunResult":
+        """Run a .jvav program in-process and report what it did.
+
+        ``inputs`` feeds tupni one string per call (EOFError when used up;
+        None keeps the current input provider). With ``capture``, output
+        goes to the result instead of ``self.stdout``/``self.stderr``.
+        Without ``reuse_env`` the evaluator is reset first. Compiled code
+        comes from the process-wide program cache. Errors are reported in
+        the result (and on stderr as ``[error] ...``), not raised.
+        """
+        if not reuse_env:
+            self.reset()
+        saved = (self.stdout, self.stderr, self._input_provider)
+        if capture:
+            self.stdout, self.stderr = io.StringIO(), io.StringIO()
+        if inputs is not None:
+            feed = iter(inputs)
+
+            def next_input(prompt: str = "") -> str:
+                for value in feed:
+                    return value
+                raise EOFError("No more input")
+            self.set_input_provider(next_input)
+        result = RunResult()
+        started = time.perf_counter()
+        try:
+            try:
+                entry = self._compile_source_file(source, None, '<input>', echo=True)
+            finally:
+                compiled = time.perf_counter()
+                result.compile_ms = (compiled - started) * 1000
+            self._last_result = None
+            self._show_results = False
+            if entry is not None:
+                exec(entry[0], self.env)
+            result.value = self._last_result
+        except SyntaxError as e:
+            result.error = f"Syntax error: {e.msg} on line {e.lineno}"
+        except Exception as exc:
+            result.error = str(exc) or type(exc).__name__
+        finally:
+            result.run_ms = (time.perf_counter() - started) * 1000 - result.compile_ms
+            self._show_results = True
+            if result.error is not None:
+                print(f"[error] {result.error}", file=self.stderr or sys.stderr)
+            if capture:
+                result.stdout, result.stderr = self.stdout.getvalue(), self.stderr.getvalue()
+            self.stdout, self.stderr = saved[:2]
+            self.set_input_provider(saved[2])
+        return result
 
     def set_input_provider(self, provider: Callable[[str], str]) -> None:
         """Set custom input provider."""
@@ -619,10 +2525,6 @@ class SafeEvaluator:
         if not code or code.startswith("#"):
             return None
 
-        if code == "break":
-            self.env['__BREAK__'] = True
-            return None
-
         # Check for advanced statements
         if code.startswith("def "):
             return self._exec_function_def(code)
@@ -643,66 +2545,88 @@ class SafeEvaluator:
         if code.startswith("plugin "):
             return self._exec_plugin_command(code)
 
-        # Try as expression first
-        try:
-            node = ast.parse(code, mode='eval')
-            self._validate_ast(node, mode='eval')
-            globals_dict = {'__builtins__': {}}
-            globals_dict.update(self.env)
-            return eval(compile(node, '<input>', 'eval'), globals_dict, self.env)
-        except SyntaxError:
-            # Try as exec statement
-            node = ast.parse(code, mode='exec')
-            self._validate_ast(node, mode='exec')
-            globals_dict = {'__builtins__': {}}
-            globals_dict.update(self.env)
-            exec(compile(node, '<input>', 'exec'), globals_dict, self.env)
-            return None
+        code_obj, mode = self._compile_line(code)
+        if mode == 'eval':
+            return eval(code_obj, self.env)
+        exec(code_obj, self.env)
+        return None
+
+    def eval_many(self, source: str, echo: bool = True, src_path: Optional[Path] = None) -> Any:
+        """Run a multi-statement program, compiled and validated once as a whole.
+
+        Top-level expression statements print their non-None results, as in
+        the REPL, and the last one is returned (unless ``echo`` is False).
+        Programs read from ``src_path`` are cached in its __jvavcache__.
+        Nothing runs if the program fails to parse or validate.
+        """
+        entry = self._compile_source_file(source, src_path, '<file>' if src_path else '<input>', echo)
+        self._last_result = None
+        if entry is not None:
+            exec(entry[0], self.env)
+        return self._last_result
+
+    def _echo_hook(self, value: Any) -> None:
+        """Target of top-level expression statements in eval_many (installed as ``__jvav_echo__``)."""
+        self._last_result = value
+        if value is not None and self._show_results:
+            print(value, file=self.stdout)
+
+    def _compile_line(self, code: str, mode: Optional[str] = None) -> tuple:
+        """Parse, validate and compile a statement, memoized in the code cache.
+
+        With ``mode=None`` the code is tried as an expression first and falls
+        back to a statement. Returns ``(code_object, mode)``.
+        """
+        key = (code, mode)
+        entry = self._cached_code(key)
+        if entry is not None:
+            return entry
+        if mode is None:
+            try:
+                node = ast.parse(code, mode='eval')
+                mode = 'eval'
+            except SyntaxError:
+                node = ast.parse(code, mode='exec')
+                mode = 'exec'
+        else:
+            node = ast.parse(code, mode=mode)
+        self._validate_ast(node, mode=mode, source=code)
+        if mode == 'exec':
+            node = _eliminate_tail_calls(node)
+        node, assumed = self._optimize_tree(node)
+        entry = (compile(node, '<input>', mode), mode)
+        self._code_cache.put(key, (entry, assumed))
+        self._refresh_optimized(entry[0])
+        return entry
+
+    def cache_info(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters of the compiled-statement cache."""
+        return self._code_cache.info()
 
     def _exec_function_def(self, code: str) -> Any:
         """Execute function definition."""
-        node = ast.parse(code, mode='exec')
-        self._validate_ast(node, mode='exec')
-        # Create global namespace with __builtins__ and all reversed functions
-        globals_dict = {'__builtins__': {}}
-        globals_dict.update(self.env)
-        # Also use globals_dict as locals so functions are stored there
-        exec(compile(node, '<input>', 'exec'), globals_dict, globals_dict)
-        # Sync newly defined functions back to self.env
-        for key, value in globals_dict.items():
-            if key != '__builtins__' and callable(value) and not key.startswith('__'):
-                self.env[key] = value
+        code_obj, _ = self._compile_line(code, 'exec')
+        # The function's globals are self.env itself, so recursion and later
+        # definitions resolve live instead of through a private snapshot.
+        exec(code_obj, self.env)
         return None
 
     def _exec_class_def(self, code: str) -> Any:
         """Execute class definition."""
-        node = ast.parse(code, mode='exec')
-        self._validate_ast(node, mode='exec')
-        globals_dict = {'__builtins__': {}}
-        globals_dict.update(self.env)
-        exec(compile(node, '<input>', 'exec'), globals_dict, globals_dict)
-        # Sync newly defined classes back to self.env
-        for key, value in globals_dict.items():
-            if key != '__builtins__' and not key.startswith('__'):
-                self.env[key] = value
+        code_obj, _ = self._compile_line(code, 'exec')
+        exec(code_obj, self.env)
         return None
 
     def _exec_if_statement(self, code: str) -> Any:
         """Execute if statement."""
-        node = ast.parse(code, mode='exec')
-        self._validate_ast(node, mode='exec')
-        globals_dict = {'__builtins__': {}}
-        globals_dict.update(self.env)
-        exec(compile(node, '<input>', 'exec'), globals_dict, self.env)
+        code_obj, _ = self._compile_line(code, 'exec')
+        exec(code_obj, self.env)
         return None
 
     def _exec_try_statement(self, code: str) -> Any:
         """Execute try statement."""
-        node = ast.parse(code, mode='exec')
-        self._validate_ast(node, mode='exec')
-        globals_dict = {'__builtins__': {}}
-        globals_dict.update(self.env)
-        exec(compile(node, '<input>', 'exec'), globals_dict, self.env)
+        code_obj, _ = self._compile_line(code, 'exec')
+        exec(code_obj, self.env)
         return None
 
     def _exec_import(self, code: str) -> Any:
@@ -731,150 +2655,163 @@ class SafeEvaluator:
             if command == "load" and len(parts) >= 3:
                 plugin_name = parts[2]
                 success = self.load_plugin(plugin_name)
-                print(f"[plugin] {'Loaded' if success else 'Failed to load'} plugin: {plugin_name}")
+                print(f"[plugin] {'Loaded' if success else 'Failed to load'} plugin: {plugin_name}", file=self.stdout)
             elif command == "unload" and len(parts) >= 3:
                 plugin_name = parts[2]
                 success = self.unload_plugin(plugin_name)
-                print(f"[plugin] {'Unloaded' if success else 'Failed to unload'} plugin: {plugin_name}")
+                print(f"[plugin] {'Unloaded' if success else 'Failed to unload'} plugin: {plugin_name}", file=self.stdout)
             elif command == "list":
                 available = self.list_plugins()
                 loaded = self.list_loaded_plugins()
-                print(f"[plugin] Available: {', '.join(available)}")
-                print(f"[plugin] Loaded: {', '.join(loaded)}")
+                print(f"[plugin] Available: {', '.join(available)}", file=self.stdout)
+                print(f"[plugin] Loaded: {', '.join(loaded)}", file=self.stdout)
         return None
 
     def _import_module(self, module_name: str) -> Any:
         """Import a module."""
-        if module_name in self.modules:
-            self.env[module_name] = self.modules[module_name]
-            return self.modules[module_name]
+        module = self._resolve_module(module_name)
+        if module is None:
+            print(f"[error] Module '{module_name}' not found", file=self.stdout)
+            return None
+        self.env[module_name] = module
+        return module
+
+    def _resolve_module(self, module_name: str) -> Any:
+        """Find a module: cached, built-in, a user ``.jvav`` file, or a jvavpkg library.
+
+        User modules are re-run when their file changed since they were
+        imported; otherwise every import shares the first run's namespace.
+        """
+        module = self.modules.get(module_name)
+        if module is not None and not isinstance(module, _FileModule):
+            return module
 
         if module_name == "math":
-            self.modules[module_name] = {'ip': math.pi, 'e': math.e, 'qes': math.sqrt}
+            module = self.modules[module_name] = {'ip': math.pi, 'e': math.e, 'qes': math.sqrt}
         elif module_name == "random":
-            self.modules[module_name] = {'modnar': random.random, 'modnartegrat': random.randint}
+            module = self.modules[module_name] = {'modnar': random.random, 'modnartegrat': random.randint}
         elif module_name == "json":
-            self.modules[module_name] = {'sdaol': json.loads, 'smpud': json.dumps}
+            module = self.modules[module_name] = {'sdaol': json.loads, 'smpud': json.dumps}
         else:
-            print(f"[error] Module '{module_name}' not found")
-            return None
-
-        self.env[module_name] = self.modules[module_name]
-        return self.modules[module_name]
+            found = self._find_module_file(module_name)
+            if found is not None:
+                path, mtime_ns = found
+                if module is not None and module.path == path and module.mtime_ns == mtime_ns:
+                    return module
+                return self._load_file_module(module_name, path, mtime_ns)
+            if module is not None:
+                return module
+            # jvavpkg library: its files run on first name lookup
+            module = self._package_module(module_name)
+        return module
 
     def _import_from_module(self, module_name: str, names: List[str]) -> Any:
         """Import specific names from a module."""
         module = self._import_module(module_name)
-        if module:
+        if module is not None:
             for name in names:
                 if name in module:
                     self.env[name] = module[name]
                 else:
-                    print(f"[error] Name '{name}' not found in module '{module_name}'")
+                    print(f"[error] Name '{name}' not found in module '{module_name}'", file=self.stdout)
         return module
 
     def _eval_expression(self, expr: str) -> Any:
         """Evaluate an expression."""
-        node = ast.parse(expr, mode="eval")
-        self._validate_ast(node, mode='eval')
-        globals_dict = {'__builtins__': {}}
-        globals_dict.update(self.env)
-        return eval(compile(node, "<input>", "eval"), globals_dict, self.env)
+        code_obj, _ = self._compile_line(expr.strip(), 'eval')
+        return eval(code_obj, self.env)
+
+    def _compile_loop(self, stmt: str, keyword: str) -> tuple:
+        """Compile a one-line ``for``/``while`` statement into one native loop.
+
+        Returns ``(code_object, loop_variable)``; the loop variable is None
+        unless the loop is a ``for`` over a plain name.
+        """
+        key = (stmt, keyword)
+        entry = self._cached_code(key)
+        if entry is not None:
+            return entry
+        try:
+            node = ast.parse(stmt, mode='exec')
+        except SyntaxError:
+            # Compound body on one line (``for x in xs: if x: tnirp(x)``):
+            # parse header and body separately and splice them together.
+            # ``while`` bodies are ';'-separated statements at the top level,
+            # so ``while c: if x: a; b`` runs ``b`` on every iteration.
+            header, body = stmt.split(": ", 1)
+            node = ast.parse(header.strip() + ": pass", mode='exec')
+            pieces = _split_statements(body) if keyword == "while" else [body]
+            node.body[0].body = [st for piece in pieces for st in ast.parse(piece.strip(), mode='exec').body]
+        loop_types = {"for": ast.For, "while": ast.While}
+        if len(node.body) != 1 or not isinstance(node.body[0], loop_types[keyword]):
+            raise ValueError(f"Invalid {keyword} loop syntax")
+        self._validate_ast(node, mode='exec', source=stmt)
+        loop = node.body[0]
+        var_name = loop.target.id if isinstance(loop, ast.For) and isinstance(loop.target, ast.Name) else None
+        node, assumed = self._optimize_tree(node)
+        entry = (compile(node, '<input>', 'exec'), var_name)
+        self._code_cache.put(key, (entry, assumed))
+        self._refresh_optimized(entry[0])
+        return entry
 
     def _exec_for_loop(self, stmt: str) -> Any:
         """Execute a for loop."""
         if not stmt.startswith("for ") or ": " not in stmt:
             raise ValueError("Invalid for loop syntax")
-        parts = stmt.split(": ", 1)
-        if len(parts) != 2:
-            raise ValueError("Invalid for loop syntax")
-        loop_part = parts[0].strip()
-        body = parts[1].strip()
-
-        loop_words = loop_part.split()
-        if len(loop_words) != 4 or loop_words[0] != "for" or loop_words[2] != "in":
-            raise ValueError("Invalid for loop syntax")
-        var_name = loop_words[1]
-        iterable_expr = loop_words[3]
-
-        iterable = self._eval_expression(iterable_expr)
-
-        for item in iterable:
-            old_value = self.env.get(var_name)
-            self.env[var_name] = item
-            try:
-                self.eval_line(body)
-                if self.env.get('__BREAK__'):
-                    try:
-                        del self.env['__BREAK__']
-                    except KeyError:
-                        pass
-                    break
-            finally:
-                if old_value is not None:
-                    self.env[var_name] = old_value
+        code_obj, var_name = self._compile_loop(stmt, "for")
+        # The loop variable is scoped to the loop, as in earlier releases
+        missing = object()
+        old_value = self.env.get(var_name, missing) if var_name else missing
+        try:
+            exec(code_obj, self.env)
+        finally:
+            if var_name:
+                if old_value is missing:
+                    self.env.pop(var_name, None)
                 else:
-                    if var_name in self.env:
-                        del self.env[var_name]
+                    self.env[var_name] = old_value
         return None
 
     def _exec_while(self, stmt: str) -> Any:
         """Execute a while loop."""
         if not stmt.startswith("while ") or ": " not in stmt:
             raise ValueError("Invalid while loop syntax")
-        parts = stmt.split(": ", 1)
-        if len(parts) != 2:
-            raise ValueError("Invalid while loop syntax")
-        condition_part = parts[0].strip()
-        body = parts[1].strip()
-
-        condition = condition_part[len('while '):].strip()
-
-        while True:
-            cond_val = self._eval_expression(condition)
-            if not cond_val:
-                break
-
-            statements = [s.strip() for s in body.split(';') if s.strip()]
-            for st in statements:
-                self.eval_line(st)
-                if self.env.get('__BREAK__'):
-                    try:
-                        del self.env['__BREAK__']
-                    except KeyError:
-                        pass
-                    return None
+        code_obj, _ = self._compile_loop(stmt, "while")
+        exec(code_obj, self.env)
         return None
 
-    def _validate_ast(self, node: ast.AST, mode: str = 'eval') -> None:
-        """Validate AST for safety."""
+    def _validate_ast(self, node: ast.AST, mode: str = 'eval', source: Optional[str] = None,
+                      allow_imports: bool = False) -> None:
+        """Validate AST for safety.
+
+        When the ``source`` text the tree was parsed from is given, the
+        verdict is memoized process-wide under it. Names called in eval
+        mode are always re-checked against the current env. With
+        ``allow_imports``, module-level import statements are accepted;
+        with --safe-methods, whitelisted method calls.
+        """
         if mode not in ('eval', 'exec'):
             raise ValueError("Invalid mode for AST validation")
 
-        for n in ast.walk(node):
-            if isinstance(n, ast.Lambda):
-                raise ValueError("Forbidden syntax: Lambda")
-
-            if isinstance(n, ast.Name) and n.id.startswith("__"):
-                raise ValueError("Access to dunder names is blocked")
-
-            if mode == 'eval':
-                if isinstance(n, ast.Attribute):
-                    raise ValueError("Attribute access is blocked in expressions")
-                if isinstance(n, (ast.Import, ast.ImportFrom)):
-                    raise ValueError("Import statements are not allowed in expressions")
-                if isinstance(n, ast.Call):
-                    if isinstance(n.func, ast.Name):
-                        if n.func.id not in self.env:
-                            raise ValueError(f"Unknown function: {n.func.id}")
-                    else:
-                        raise ValueError("Only simple function names are allowed in calls")
-
-            else:  # exec mode
-                if isinstance(n, (ast.Import, ast.ImportFrom)):
-                    raise ValueError("Use the top-level import command: 'import <module>'")
-                if isinstance(n, ast.Attribute):
-                    raise ValueError("Attribute access is blocked in statements")
+        key = (mode, allow_imports, self.safe_methods, source) if source is not None else None
+        verdict = _VALIDATION_MEMO.get(key) if key is not None else None
+        if verdict is None:
+            validator = _SafetyValidator(mode, allow_imports, self.safe_methods)
+            try:
+                validator.visit(node)
+                verdict = (None, tuple(validator.called))
+            except ValueError as exc:
+                verdict = (str(exc), ())
+            if key is not None:
+                _VALIDATION_MEMO.put(key, verdict)
+
+        error, called = verdict
+        if error is not None:
+            raise ValueError(error)
+        env = self.env
+        for name in called:
+            if name not in env and name not in _HELPERS:
+                raise ValueError(f"Unknown function: {name}")
 
 
 def run_repl(evaluator: SafeEvaluator) -> int:
@@ -894,6 +2831,19 @@ def run_repl(evaluator: SafeEvaluator) -> int:
             if not line.strip():
                 continue
             try:
+                if line.rstrip().endswith(':'):
+                    # A typed or pasted block runs as one program once a blank line ends it
+                    block = [line]
+                    while True:
+                        try:
+                            more = input("....> ")
+                        except EOFError:
+                            break
+                        if not more.strip():
+                            break
+                        block.append(more)
+                    evaluator.eval_many("\n".join(block))
+                    continue
                 result = evaluator.eval_line(line)
                 if result is not None:
                     print(result)
@@ -905,13 +2855,21 @@ def run_repl(evaluator: SafeEvaluator) -> int:
 
 
 def run_command(evaluator: SafeEvaluator, command: str) -> int:
-    """Run a single command."""
+    """Run a -c program in one go, printing expression results as the REPL does.
+
+    Commands that do not parse as a program (REPL forms such as ``plugin
+    load x``) run one ';'-separated statement at a time instead.
+    """
     try:
-        commands = [cmd.strip() for cmd in command.split(';') if cmd.strip()]
-        for cmd in commands:
-            result = evaluator.eval_line(cmd)
-            if result is not None:
-                print(result)
+        try:
+            evaluator._compile_source_file(command, None, '<input>', echo=True)
+        except SyntaxError:
+            for cmd in _split_statements(command):
+                result = evaluator.eval_line(cmd)
+                if result is not None:
+                    print(result)
+            return 0
+        evaluator.eval_many(command)  # served from the code cache
         return 0
     except Exception as exc:
         print(f"[error] {exc}")
@@ -924,55 +2882,19 @@ def run_file(evaluator: SafeEvaluator, file_path: str) -> int:
         if file_path.endswith('.jvavpkg'):
             with open(file_path, 'r', encoding='utf-8') as f:
                 package = json.load(f)
-            main_content = package["files"]["main.jvav"]
-            raw_lines = main_content.split('\n')
+            source = package["files"]["main.jvav"]
         else:
             with open(file_path, 'r', encoding='utf-8') as f:
-                raw_lines = f.readlines()
-
-        # JVAV reversed keywords → Python (ponytail: no 'file'→'elif', too common in strings)
-        _KW_MAP = KW_MAP
+                source = f.read()
 
-        def _preprocess_lines(lines: list[str]) -> list[str]:
-            """Preprocessor - translate JVAV keywords, filter comments and blank lines."""
-            result: list[str] = []
-
-            for line in lines:
-                stripped = line.rstrip('\n')
-                # Skip empty lines and comment lines
-                if not stripped.strip() or stripped.lstrip().startswith('#'):
-                    continue
-                # Translate reversed keywords (whole-word only)
-                for jvav_kw, py_kw in _KW_MAP:
-                    stripped = re.sub(r'\b' + jvav_kw + r'\b', py_kw, stripped)
-                result.append(stripped)
-
-            return result
-
-        lines = _preprocess_lines(raw_lines)
         evaluator.set_input_provider(lambda prompt='': '1')
+        evaluator.script_dir = Path(file_path).resolve().parent
 
-        # Join all lines preserving indentation and execute as a single block
-        complete_code = '\n'.join(lines)
-        
-        if not complete_code.strip():
-            return 0
-        
         try:
-            # Parse and validate the complete code
-            node = ast.parse(complete_code, mode='exec')
-            
-            # Validate AST
-            evaluator._validate_ast(node, mode='exec')
-            
-            # Execute the complete code block with proper namespace
-            globals_dict = {'__builtins__': {}}
-            globals_dict.update(evaluator.env)
-            exec(compile(node, '<file>', 'exec'), globals_dict, globals_dict)
-            # Sync all variables and functions back to evaluator.env
-            for key, value in globals_dict.items():
-                if key != '__builtins__' and not key.startswith('__'):
-                    evaluator.env[key] = value
+            # Preprocess, parse, validate and compile the whole file as one
+            # block (served from __jvavcache__ when the source is unchanged)
+            # and run it directly in the live namespace
+            evaluator.eval_many(source, echo=False, src_path=Path(file_path))
             return 0
         except SyntaxError as e:
             print(f"[error] Syntax error: {e.msg} on line {e.lineno}")
@@ -988,19 +2910,333 @@ def run_file(evaluator: SafeEvaluator, file_path: str) -> int:
         return 1
 
 
+def run_stream(evaluator: SafeEvaluator, file_path: str) -> int:
+    """Run a file while reading it, a batch of top-level statements at a time (--stream).
+
+    Memory is bounded by the largest statement (plus STREAM_BATCH_SIZE) and
+    output starts after the first batch. Nothing is written to
+    __jvavcache__, and -OO does not hoist module-level names. A .jvavpkg
+    is JSON, so it is loaded whole and its main.jvav is streamed from memory.
+    """
+    def run_batch(batch: List[str], start: int) -> None:
+        try:
+            entry = evaluator._compile_program("".join(batch), '<file>', whole_file=False)
+        except SyntaxError as e:
+            raise SyntaxError(e.msg, ('<file>', start + (e.lineno or 1) - 1, e.offset, e.text)) from None
+        if entry is not None:
+            exec(entry[0], evaluator.env)
+
+    try:
+        evaluator.set_input_provider(lambda prompt='': '1')
+        evaluator.script_dir = Path(file_path).resolve().parent
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if file_path.endswith('.jvavpkg'):
+                f = io.StringIO(json.load(f)["files"]["main.jvav"])
+            batch: List[str] = []
+            size = start = 0
+            for row, statement in _top_level_statements(f):
+                if not batch:
+                    start = row
+                batch.append(statement)
+                size += len(statement)
+                if size >= STREAM_BATCH_SIZE:
+                    run_batch(batch, start)
+                    batch.clear()
+                    size = 0
+            if batch:
+                run_batch(batch, start)
+        return 0
+    except FileNotFoundError:
+        print(f"[error] File not found: {file_path}")
+        return 1
+    except SyntaxError as e:
+        print(f"[error] Syntax error: {e.msg} on line {e.lineno}")
+        return 1
+    except Exception as exc:
+        print(f"[error] {exc}")
+        return 1
+
+
+class _EvaluatorPool:
+    """Warm SafeEvaluators handed out one job at a time (jvav serve).
+
+    After each job the evaluator is reset, or replaced by a fresh one once
+    it has run ``recycle_after`` jobs, before it goes back to the pool.
+    """
+
+    def __init__(self, size: int = SERVE_WORKERS, recycle_after: int = SERVE_RECYCLE_AFTER,
+                 **options: Any) -> None:
+        import queue
+        import threading
+        if size < 1:
+            raise ValueError("An evaluator pool needs at least one worker")
+        self.size = size
+        self.recycle_after = recycle_after
+        self.options = options
+        self.jobs = 0
+        self.recycled = 0
+        self._lock = threading.Lock()
+        self._idle: Any = queue.Queue()
+        for _ in range(size):
+            self._idle.put([SafeEvaluator(**options), 0])
+
+    def run(self, source: str, inputs: Optional[Iterable[str]] = ()) -> RunResult:
+        """Run one job on an idle evaluator (waiting for one if all are busy)."""
+        slot = self._idle.get()
+        try:
+            return slot[0].run_source(source, inputs=inputs)
+        finally:
+            slot[1] += 1
+            with self._lock:
+                self.jobs += 1
+            if slot[1] >= self.recycle_after:
+                slot[:] = [SafeEvaluator(**self.options), 0]
+                with self._lock:
+                    self.recycled += 1
+            else:
+                slot[0].reset()
+            self._idle.put(slot)
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": self.size, "idle": self._idle.qsize(), "jobs": self.jobs, "recycled": self.recycled}
+
+
+def _json_value(value: Any) -> Any:
+    """``value`` if JSON can carry it, else its repr."""
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def make_server(host: str = "127.0.0.1", port: int = SERVE_PORT, pool: Optional[_EvaluatorPool] = None,
+                verbose: bool = False) -> Any:
+    """Build the jvav serve HTTP server (call ``serve_forever()`` on it).
+
+    ``POST /run`` takes ``{"source": str, "inputs": [str, ...]}`` and
+    answers with the RunResult fields as JSON; ``GET /health`` reports the
+    pool. Port 0 picks a free port (see ``server.server_address``).
+    """
+    import http.server
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        server_version = f"jvav/{JVAV_VERSION}"
+
+        def _reply(self, status: int, body: Dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            if self.path != "/health":
+                self._reply(404, {"error": "Not found"})
+                return
+            self._reply(200, {"ok": True, **self.server.pool.stats()})
+
+        def do_POST(self) -> None:
+            if self.path != "/run":
+                self._reply(404, {"error": "Not found"})
+                return
+            header = self.headers.get("Content-Length")
+            if header is None:
+                self._reply(411, {"error": "Content-Length required"})
+                return
+            try:
+                length = int(header)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._reply(400, {"error": "Invalid Content-Length"})
+                return
+            if length > SERVE_MAX_BODY:
+                self._reply(413, {"error": f"Request body over {SERVE_MAX_BODY} bytes"})
+                return
+            try:
+                job = json.loads(self.rfile.read(length))
+                source, inputs = job["source"], job.get("inputs", [])
+                if (not isinstance(source, str) or not isinstance(inputs, list)
+                        or not all(isinstance(item, str) for item in inputs)):
+                    raise TypeError
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self._reply(400, {"error": 'Expected JSON {"source": str, "inputs": [str, ...]}'})
+                return
+            result = self.server.pool.run(source, inputs)
+            self._reply(200, {"ok": result.ok, "stdout": result.stdout, "stderr": result.stderr,
+                              "value": _json_value(result.value), "error": result.error,
+                              "compile_ms": result.compile_ms, "run_ms": result.run_ms})
+
+        def log_message(self, format: str, *args: Any) -> None:
+            if verbose:
+                super().log_message(format, *args)
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.pool = pool if pool is not None else _EvaluatorPool()
+    return server
+
+
+def run_serve(host: str, port: int, workers: int, recycle_after: int, verbose: bool = False,
+              **options: Any) -> int:
+    """jvav serve: answer run requests from a pool of warm evaluators until interrupted."""
+    if workers < 1:
+        print(f"[error] --workers must be at least 1, got {workers}")
+        return 1
+    try:
+        server = make_server(host, port, _EvaluatorPool(workers, recycle_after, **options), verbose)
+    except OSError as exc:
+        print(f"[error] Cannot listen on {host}:{port}: {exc}")
+        return 1
+    bound_host, bound_port = server.server_address[:2]
+    print(f"[serve] listening on http://{bound_host}:{bound_port} ({workers} workers)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[exit]")
+    finally:
+        server.server_close()
+    return 0
+
+
+def run_deep(job: Callable[[], int], stack_mb: int = DEEP_RECURSION_STACK_MB,
+             recursion_limit: Optional[int] = None) -> int:
+    """Run ``job`` (run_file/run_command/run_repl) on a large-stack worker thread.
+
+    The recursion limit defaults to what the stack can hold. A profile
+    function on the worker thread counts Python calls and returns, and the
+    exact peak depth is reported on stderr when the job ends.
+    """
+    import threading
+    stack_bytes = stack_mb * 1024 * 1024
+    limit = recursion_limit or stack_bytes // _STACK_BYTES_PER_FRAME
+    state = {"rc": 1, "depth": 0, "peak": 0}
+
+    def count_depth(frame: Any, event: str, arg: Any) -> None:
+        if event == "call":
+            depth = state["depth"] = state["depth"] + 1
+            if depth > state["peak"]:
+                state["peak"] = depth
+        elif event == "return":
+            state["depth"] -= 1
+
+    def worker() -> None:
+        sys.setprofile(count_depth)  # only this thread is profiled
+        try:
+            state["rc"] = job()
+        finally:
+            sys.setprofile(None)
+
+    old_stack = threading.stack_size(stack_bytes)
+    old_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(limit)
+    try:
+        thread = threading.Thread(target=worker, name="jvav-deep-recursion", daemon=True)
+        thread.start()
+        while thread.is_alive():
+            thread.join(0.05)
+    except KeyboardInterrupt:
+        print("\n[exit]")
+        return 130
+    finally:
+        threading.stack_size(old_stack)
+        sys.setrecursionlimit(old_limit)
+        print(f"[deep-recursion] peak depth {state['peak']} (stack {stack_mb} MiB, limit {limit})",
+              file=sys.stderr)
+    return state["rc"]
+
+
+def dump_optimized(evaluator: SafeEvaluator, file_path: str) -> int:
+    """Print a file as the optimizer rewrites it (for checking -O changes)."""
+    try:
+        source = Path(file_path).read_text(encoding='utf-8')
+        print(evaluator.optimized_source(source))
+        return 0
+    except FileNotFoundError:
+        print(f"[error] File not found: {file_path}")
+        return 1
+    except SyntaxError as e:
+        print(f"[error] Syntax error: {e.msg} on line {e.lineno}")
+        return 1
+    except Exception as exc:
+        print(f"[error] {exc}")
+        return 1
+
+
+def print_memo_report(evaluator: SafeEvaluator) -> None:
+    """Print --memoize-pure cache statistics to stderr."""
+    if not evaluator.memoized:
+        print("[memoize] no pure functions memoized", file=sys.stderr)
+    for name, func in evaluator.memoized.items():
+        info = func.cache.info()
+        print(f"[memoize] {name}: {info['hits']} hits, {info['misses']} misses, "
+              f"{info['size']} cached, {func.bypassed} uncached calls", file=sys.stderr)
+
+
+def print_startup_report(evaluator: SafeEvaluator) -> None:
+    """Print the start-up time breakdown (module import, helpers, plugins, packages)."""
+    phases = dict(STARTUP_TIMINGS)
+    phases.update(evaluator.startup_timings)
+    print(f"JVAV {JVAV_VERSION} start-up profile (ms)")
+    for phase, ms in phases.items():
+        print(f"  {phase:<20}{ms:>9.3f}")
+    print(f"  {'total':<20}{sum(phases.values()):>9.3f}")
+    deferred = [name for name in ("urllib.request", "subprocess", "statistics", "inspect", "hashlib", "base64",
+                                  "sqlite3", "http.server")
+                if name not in sys.modules]
+    print(f"Deferred (not yet imported): {', '.join(deferred) or '-'}")
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="JVAV DK27 - Turing-complete brainwave programming language.")
     parser.add_argument("-c", dest="command", help="Run a single command and exit", default=None)
     parser.add_argument("-f", "--file", dest="file_path", help="Run commands from a file and exit", default=None)
-    parser.add_argument("action", nargs="?", help="Action to perform: run, info", default=None)
+    parser.add_argument("action", nargs="?", help="Action to perform: run, info, serve", default=None)
     parser.add_argument("target", nargs="*", help="Target for action", default=[])
+    parser.add_argument("--startup", action="store_true", help="With 'info': report start-up time by phase")
+    parser.add_argument("-O", dest="optimize", action="count", default=0,
+                        help="Optimize: -O inlines reversed helper calls, -OO also folds constants "
+                             "and hoists loop invariants")
+    parser.add_argument("--stream", action="store_true",
+                        help="With -f: execute top-level statements as the file is read (for very large files)")
+    parser.add_argument("--dump-optimized", action="store_true",
+                        help="With -f: print the file as compiled at the -O level (default -OO) and exit")
+    parser.add_argument("--memoize-pure", action="store_true",
+                        help="Cache results of pure user functions; report hit statistics on exit")
+    parser.add_argument("--safe-methods", action="store_true",
+                        help="Allow direct method calls (lst.append(x)) on built-in values from a whitelist")
+    parser.add_argument("--host", default="127.0.0.1", help="With 'serve': address to listen on")
+    parser.add_argument("--port", type=int, default=SERVE_PORT, help=f"With 'serve': port (default {SERVE_PORT})")
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS,
+                        help=f"With 'serve': warm evaluators, i.e. concurrent jobs (default {SERVE_WORKERS})")
+    parser.add_argument("--recycle-after", type=int, default=SERVE_RECYCLE_AFTER, metavar="N",
+                        help="With 'serve': replace an evaluator after N jobs (it is reset after every job)")
+    parser.add_argument("--verbose", action="store_true", help="With 'serve': log every request")
+    parser.add_argument("--deep-recursion", action="store_true",
+                        help="Run on a worker thread with a large stack and recursion limit; report peak depth")
+    parser.add_argument("--stack-size", type=int, default=DEEP_RECURSION_STACK_MB, metavar="MB",
+                        help=f"With --deep-recursion: worker stack size (default {DEEP_RECURSION_STACK_MB})")
+    parser.add_argument("--recursion-limit", type=int, default=None, metavar="N",
+                        help="With --deep-recursion: recursion limit (default: derived from the stack size)")
     args = parser.parse_args(argv)
+    if args.dump_optimized and not args.optimize:
+        args.optimize = 2
 
-    evaluator = SafeEvaluator()
+    options = dict(optimize=args.optimize, memoize_pure=args.memoize_pure, safe_methods=args.safe_methods)
+    if args.action == "serve":
+        return run_serve(args.host, args.port, args.workers, args.recycle_after, args.verbose, **options)
+    evaluator = SafeEvaluator(**options)
     if args.command:
-        return run_command(evaluator, args.command)
+        job = functools.partial(run_command, evaluator, args.command)
+    elif args.file_path and args.dump_optimized:
+        return dump_optimized(evaluator, args.file_path)
     elif args.file_path:
-        return run_file(evaluator, args.file_path)
+        job = functools.partial(run_stream if args.stream else run_file, evaluator, args.file_path)
+    elif args.action == "info" and args.startup:
+        print_startup_report(evaluator)
+        return 0
     elif args.action == "info":
         print("JVAV DK27 - Turing-Complete Brainwave Programming Language")
         print("Features:")
@@ -1013,7 +3249,11 @@ def main(argv: list[str] | None = None) -> int:
         print("  ✓ Safe AST Validation")
         return 0
     else:
-        return run_repl(evaluator)
+        job = functools.partial(run_repl, evaluator)
+    rc = run_deep(job, args.stack_size, args.recursion_limit) if args.deep_recursion else job()
+    if args.memoize_pure:
+        print_memo_report(evaluator)
+    return rc
 
 
 if __name__ == "__main__":
@@ -27,6 +27,7 @@ jvavpkg.py - JVAV 包管理器 (P1/P2)
 安装位置:
   global: ~/.jvav/packages/<name>/
   local : <cwd>/.jvav/packages/<name>/
+  索引  : <packages>/index.json（install/update/uninstall 时重建，解释器启动时直接读取）
 """
 
 import argparse
@@ -56,6 +57,9 @@ RAW_BASE = "https://raw.githubusercontent.com"
 MANIFEST_FILE = "jvavpkg.json"
 LINKS_FILE = "jvavpkg.links"
 PLATFORM = "win64"
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+CACHE_DIR = "__jvavcache__"  # interpreter bytecode cache of .jvav modules kept in the root
 
 
 class JVAVPkgError(Exception):
@@ -185,6 +189,29 @@ class PackageManager:
     def _save_json(self, path: Path, data: Any) -> None:
         path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
 
+    def _index_entry(self, pkg_dir: Path) -> Dict[str, Any]:
+        """Index record for one installed package directory."""
+        manifest = self._load_json(pkg_dir / "manifest.json", {})
+        pkg_type = manifest.get("type", "library") if isinstance(manifest, dict) else "library"
+        src_dir = pkg_dir / "src"
+        has_src = src_dir.is_dir() and any(src_dir.iterdir())
+        return {
+            "type": pkg_type,
+            "src": f"{pkg_dir.name}/src" if has_src else None,
+        }
+
+    def write_index(self) -> None:
+        """Rebuild packages/index.json so interpreters skip scanning every package."""
+        packages = {
+            pkg_dir.name: self._index_entry(pkg_dir)
+            for pkg_dir in sorted(self.packages_dir.iterdir())
+            if pkg_dir.is_dir() and pkg_dir.name != CACHE_DIR
+        }
+        index_path = self.packages_dir / INDEX_FILE
+        tmp_path = index_path.with_name(INDEX_FILE + ".tmp")
+        self._save_json(tmp_path, {"version": INDEX_VERSION, "packages": packages})
+        os.replace(tmp_path, index_path)
+
     def load_registry(self) -> Dict[str, str]:
         return self._load_json(self.registry_path, {})
 
@@ -495,6 +522,7 @@ class PackageManager:
             "installed_at": datetime.now().isoformat(timespec="seconds"),
         }
         self.save_lock(lock)
+        self.write_index()
         print(f"[install] done: {dest}")
 
     def cmd_uninstall(self, name: str) -> None:
@@ -506,6 +534,7 @@ class PackageManager:
             shutil.rmtree(dest)
         del lock[name]
         self.save_lock(lock)
+        self.write_index()
         print(f"[uninstall] removed {name}")
 
     def _install_asset(self, dest: Path, pkg_type: str, basename: str, data: bytes) -> None:
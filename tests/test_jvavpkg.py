@@ -148,11 +148,18 @@ def test_basic_install_uninstall_list():
     assert os.path.exists(src), "source file extracted"
     # short-name resolution via registry
     assert pm.load_registry()["two_sum"] == "BR-get/two_sum"
+    # index maintained for the interpreter
+    index = json.load(open(os.path.join(pm.packages_dir, "index.json"), encoding="utf-8"))
+    assert index["version"] == 1
+    assert index["packages"]["two_sum"]["src"] == "two_sum/src"
+    assert index["packages"]["two_sum"]["type"] == "plugin"
     # list
     pm.cmd_list()
     # uninstall
     pm.cmd_uninstall("two_sum")
     assert "two_sum" not in pm.load_lock()
+    index = json.load(open(os.path.join(pm.packages_dir, "index.json"), encoding="utf-8"))
+    assert "two_sum" not in index["packages"]
     pm.cleanup()
 
 
@@ -184,6 +191,8 @@ def test_dependency_install():
     assert lock["jvav-utils"]["version"] == "v1.0.0"
     utils_src = os.path.join(pm.packages_dir, "jvav-utils", "src", "utils.jvav")
     assert os.path.exists(utils_src)
+    index = json.load(open(os.path.join(pm.packages_dir, "index.json"), encoding="utf-8"))
+    assert index["packages"]["jvav-utils"] == {"type": "plugin", "src": "jvav-utils/src"}
     pm.cleanup()
 
 
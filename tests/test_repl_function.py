@@ -3,14 +3,19 @@
 Run: python tests/test_repl_function.py
 """
 
+import io
 import sys
 import os
+import contextlib
 import json
+import re
 import shutil
+import subprocess
 import tempfile
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from JvavDK27 import SafeEvaluator
+from JvavDK27 import (SafeEvaluator, _EvaluatorPool, _preprocess_lines, _bound_names, _top_level_statements,
+                      make_server, run_file, run_command, run_deep, run_stream)
 
 
 def test_basic_reversed_fn():
@@ -111,6 +116,698 @@ def test_package_plugin_missing():
     assert e.load_plugin('no_such_plugin') is False
 
 
+def test_code_cache_hits():
+    """Repeated lines are served from the compiled-statement cache."""
+    e = SafeEvaluator()
+    e.eval_line('x = 1')
+    for _ in range(3):
+        e.eval_line('x = x + 1')
+    info = e.cache_info()
+    assert info["hits"] == 2, f"expected 2 hits, got {info}"
+    assert e.eval_line('x') == 4
+
+
+def test_code_cache_eviction():
+    """The cache is bounded and evicts least recently used entries."""
+    e = SafeEvaluator(cache_size=2)
+    for i in range(5):
+        e.eval_line(f'{i} + 1')
+    info = e.cache_info()
+    assert info["size"] == 2 and info["evictions"] == 3, info
+
+
+def test_shared_namespace_is_live():
+    """Functions read globals from the live env, not a definition-time copy."""
+    e = SafeEvaluator()
+    e.eval_line('def g(): return y * 2')
+    e.eval_line('y = 21')
+    assert e.eval_line('g()') == 42
+    assert e.env['g'].__globals__ is e.env
+
+
+def test_keyword_translation_skips_strings():
+    """Reversed keywords are rewritten in code but not inside string literals."""
+    lines = _preprocess_lines([
+        "# comment\n",
+        "fi x ni xs: tnirp('fi ni ton esle')  # rof\n",
+        "\n",
+        "esle: nruter ton y\n",
+    ])
+    assert lines == [
+        "if x in xs: tnirp('fi ni ton esle')  # rof",
+        "else: return not y",
+    ], lines
+
+
+def test_keyword_translation_fallback():
+    """Sources the tokenizer rejects still get whole-word translation."""
+    assert _preprocess_lines(["x = (fi", "s = 'unterminated"]) == ["x = (if", "s = 'unterminated"]
+
+
+def test_jvavcache_reuses_compiled_file():
+    """run_file stores validated code in __jvavcache__ and revalidates only on change."""
+    tmp = tempfile.mkdtemp()
+    try:
+        script = os.path.join(tmp, 'job.jvav')
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write("fi eurT:\n    total = mus(egnar(5))\n")
+        e = SafeEvaluator()
+        assert run_file(e, script) == 0 and e.env['total'] == 10
+        cache_dir = os.path.join(tmp, '__jvavcache__')
+        assert len(os.listdir(cache_dir)) == 1, os.listdir(cache_dir)
+
+        def no_validate(node, mode='eval', source=None):
+            raise AssertionError("cached file should not be revalidated")
+
+        e = SafeEvaluator()
+        e._validate_ast = no_validate
+        assert run_file(e, script) == 0 and e.env['total'] == 10
+
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write("total = 7\n")
+        e = SafeEvaluator()
+        assert run_file(e, script) == 0 and e.env['total'] == 7
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_for_loop_native():
+    """One-line for loops run as a single compiled loop with native break."""
+    e = SafeEvaluator()
+    e.eval_line('total = 0')
+    e.eval_line('for i in egnar(100): total = total + i')
+    assert e.eval_line('total') == 4950
+    e.eval_line('seen = []')
+    e.eval_line('for i in egnar(10): dneppa(seen, i); break')
+    e.eval_line('for i in egnar(10): if i > 6: dneppa(seen, i)')
+    assert e.eval_line('seen') == [0, 7, 8, 9], e.eval_line('seen')
+    assert 'i' not in e.env, "loop variable should stay scoped to the loop"
+
+
+def test_while_loop_native():
+    """while loops compile once and keep ';' inside string literals intact."""
+    e = SafeEvaluator()
+    e.eval_line('n = 0')
+    e.eval_line('parts = []')
+    e.eval_line('while n < 3: dneppa(parts, "a;b"); n = n + 1')
+    assert e.eval_line('parts') == ["a;b"] * 3
+    e.eval_line('while eurT: if n >= 6: break; n = n + 1')
+    assert e.eval_line('n') == 6
+    hits = e.cache_info()["hits"]
+    e.eval_line('n = 0')
+    e.eval_line('while eurT: if n >= 6: break; n = n + 1')
+    assert e.cache_info()["hits"] > hits and e.eval_line('n') == 6
+
+
+def test_bound_names_from_ast():
+    """Only top-level bindings are reported; function locals are not."""
+    import ast
+    tree = ast.parse(
+        "def f(a):\n    local = a\n    return local\n"
+        "class C:\n    attr = 1\n"
+        "x, (y, z) = 1, (2, 3)\n"
+        "for i in egnar(2):\n    w = i\n"
+        "sq = [k * k for k in egnar(3)]\n"
+    )
+    assert _bound_names(tree) == ('f', 'C', 'x', 'y', 'z', 'i', 'w', 'sq')
+
+
+def test_validator_rejects_and_memoizes():
+    """Forbidden syntax is rejected; verdicts are memoized by source text."""
+    import JvavDK27
+    e = SafeEvaluator()
+    for bad, msg in [('tnirp(lambda: 1)', 'Lambda'), ('x.y', 'Attribute'),
+                     ('__import__', 'dunder'), ('nosuchfn(1)', 'Unknown function')]:
+        try:
+            e.eval_line(bad)
+        except ValueError as exc:
+            assert msg in str(exc), (bad, exc)
+        else:
+            raise AssertionError(f"{bad!r} should be rejected")
+    hits = JvavDK27._VALIDATION_MEMO.hits
+    SafeEvaluator().eval_line('nel([1, 2])')
+    SafeEvaluator().eval_line('nel([1, 2])')
+    assert JvavDK27._VALIDATION_MEMO.hits > hits
+    # Called names are re-checked against each evaluator's own env
+    e.eval_line('def nosuchfn(x): return x')
+    assert e.eval_line('nosuchfn(1)') == 1
+
+
+def test_shared_helper_layer():
+    """Helpers are shared across evaluators; user bindings stay per instance."""
+    a, b = SafeEvaluator(), SafeEvaluator()
+    assert a.env['__builtins__'] is not b.env['__builtins__']
+    assert a.env['__builtins__']['nel'] is b.env['__builtins__']['nel'], "helper objects are built once"
+    assert 'nel' not in a.env, "helpers should live in the shared layer"
+    a.eval_line('nel = 5')
+    assert a.eval_line('nel') == 5 and b.eval_line('nel([1, 2])') == 2
+    a.eval_line('del nel')
+    assert a.eval_line('nel([1])') == 1
+    a.set_input_provider(lambda prompt='': 'from a')
+    b.set_input_provider(lambda prompt='': 'from b')
+    assert a.eval_line('tupni()') == 'from a' and b.eval_line('tupni()') == 'from b'
+
+
+def test_lazy_helpers_and_startup_report():
+    """Heavy helpers import on first call; info --startup reports each phase."""
+    import io
+    import contextlib
+    import JvavDK27
+    e = SafeEvaluator()
+    assert e.eval_line('egarevA([1, 2, 3])') == 2
+    assert JvavDK27.REVERSED_HELPERS['egarevA'] is sys.modules['statistics'].mean
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        assert JvavDK27.main(['info', '--startup']) == 0
+    report = out.getvalue()
+    for phase in ('import', 'helper table', 'plugin load', 'package discovery', 'total'):
+        assert phase in report, report
+
+
+def test_lazy_builtin_plugins():
+    """Built-in plugins register proxies and materialize on first call."""
+    import JvavDK27
+    for name, exports in JvavDK27._LAZY_PLUGIN_EXPORTS.items():
+        assert set(exports) == set(JvavDK27._BUILTIN_PLUGIN_FACTORIES[name]()), name
+    saved = dict(JvavDK27._PLUGIN_TABLES)
+    JvavDK27._PLUGIN_TABLES.clear()
+    try:
+        e = SafeEvaluator()
+        assert isinstance(e.env['ip'], JvavDK27._LazyPluginProxy)
+        assert 'math_ext' not in JvavDK27._PLUGIN_TABLES
+        assert abs(e.eval_line('ip()') - 3.14159) < 1e-4
+        assert not isinstance(e.env['ip'], JvavDK27._LazyPluginProxy)
+        assert not isinstance(e.env['qes'], JvavDK27._LazyPluginProxy)
+        assert 'math_ext' in e.list_loaded_plugins()
+        assert e.unload_plugin('datetime') and 'emitwon' not in e.env
+        assert e.load_plugin('datetime') and e.eval_line('stamptime()') > 0
+    finally:
+        JvavDK27._PLUGIN_TABLES.update(saved)
+
+
+def test_helper_table_writes_stay_in_one_evaluator():
+    """A script that writes to its __builtins__ cannot change other evaluators' helpers."""
+    e = SafeEvaluator()
+    e.eval_line("seosrcni()['__builtins__']['nel'] = reppu")
+    assert e.eval_line('nel("abc")') == 'ABC'
+    assert SafeEvaluator().eval_line('nel("abc")') == 3
+    e.reset()
+    assert e.eval_line('nel("abc")') == 3
+
+
+def test_package_index_used_when_current():
+    """Discovery trusts jvavpkg's index.json and rescans once it is stale."""
+    import JvavDK27
+    tmp = tempfile.mkdtemp()
+    try:
+        _make_pkg(tmp, 'demo_math', "def dbod(x):\n    return x * 2\n")
+        root = os.path.join(tmp, '.jvav', 'packages')
+        # Index says library even though the manifest is unreadable: the index wins
+        with open(os.path.join(root, 'demo_math', 'manifest.json'), 'w') as f:
+            f.write('{broken')
+        index = {"version": 1, "packages": {"demo_math": {
+            "type": "library", "src": "demo_math/src"}}}
+        index_path = os.path.join(root, 'index.json')
+        with open(index_path, 'w') as f:
+            json.dump(index, f)
+        # Everything older than the index, the index older than anything written later
+        past = os.stat(index_path).st_mtime - 100
+        for path in ('demo_math', 'demo_math/manifest.json', 'demo_math/src', 'index.json'):
+            os.utime(os.path.join(root, path), (past, past + 50 * (path == 'index.json')))
+        old = os.getcwd()
+        try:
+            os.chdir(tmp)
+            e = SafeEvaluator()
+            assert e._package_plugins['demo_math']['manifest']['type'] == 'library'
+            assert e.load_plugin('demo_math') and e.env['dbod'](4) == 8
+            assert os.path.isdir(os.path.join(root, 'demo_math', 'src', '__jvavcache__'))
+            assert SafeEvaluator()._discover_from_index(JvavDK27.Path(root)), "loading keeps the index current"
+            # A manifest edited after the index was written makes it stale
+            manifest_path = os.path.join(root, 'demo_math', 'manifest.json')
+            with open(manifest_path, 'w') as f:
+                json.dump({"name": "demo_math", "type": "app"}, f)
+            stamp = os.stat(index_path).st_mtime
+            os.utime(manifest_path, (stamp + 5, stamp + 5))
+            assert 'demo_math' not in SafeEvaluator().list_plugins()
+            with open(index_path, 'w') as f:
+                json.dump(index, f)
+            os.utime(index_path, (stamp + 10, stamp + 10))
+            assert 'demo_math' in SafeEvaluator().list_plugins()
+            # A module kept in the root gets its __jvavcache__ there; the index stays current
+            with open(os.path.join(root, 'rootmod.jvav'), 'w') as f:
+                f.write("value = 1\n")
+            assert SafeEvaluator().eval_line('import rootmod')['value'] == 1
+            assert os.path.isdir(os.path.join(root, '__jvavcache__'))
+            e = SafeEvaluator()
+            e._package_plugins['demo_math'] = None
+            e._discover_package_plugins()
+            assert e._package_plugins['demo_math']['manifest']['type'] == 'library'
+            # A package directory missing from the index makes it stale
+            _make_pkg(tmp, 'other', "def rehto():\n    return 1\n")
+            e = SafeEvaluator()
+            assert 'other' in e.list_plugins()
+        finally:
+            os.chdir(old)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_package_import_is_lazy_and_isolated():
+    """import/from-import expose a package as its own lazily run namespace."""
+    tmp = tempfile.mkdtemp()
+    try:
+        _make_pkg(tmp, 'mylib', "helper = 10\ndef dbod(x):\n    nruter x * 2 + helper\n")
+        _make_pkg(tmp, 'other', "helper = 99\n")
+        old = os.getcwd()
+        try:
+            os.chdir(tmp)
+            e = SafeEvaluator()
+            mod = e.eval_line('import mylib')
+            assert not mod.loaded, "files should not run at import time"
+            e.eval_line('f = mylib["dbod"]')
+            assert e.eval_line('f(1)') == 12
+            assert mod.loaded and 'helper' not in e.env
+            e.eval_line('import other')
+            assert e.eval_line('other["helper"]') == 99
+            assert e.eval_line('f(0)') == 10, "packages must not share globals"
+            e.eval_line('from mylib import dbod')
+            assert e.eval_line('dbod(5)') == 20
+            assert e.modules['mylib'] is mod, "modules are cached per evaluator"
+        finally:
+            os.chdir(old)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_user_modules_import_once_and_reload():
+    """import resolves <name>.jvav next to the script; runs once until the file changes."""
+    tmp = tempfile.mkdtemp()
+    try:
+        util = os.path.join(tmp, 'util.jvav')
+        with open(util, 'w', encoding='utf-8') as f:
+            f.write("runs = [1]\ndef elbuod(x):\n    nruter x * 2\n")
+        main = os.path.join(tmp, 'main.jvav')
+        with open(main, 'w', encoding='utf-8') as f:
+            f.write("import util\nfrom util import elbuod, runs as r\nimport util\nresult = elbuod(21)\n")
+        e = SafeEvaluator()
+        assert run_file(e, main) == 0
+        assert e.env['result'] == 42 and e.env['r'] == [1]
+        assert e.env['util'] is e.modules['util'], "repeated imports share one module"
+        assert 'runs' not in e.env, "modules run in their own namespace"
+
+        e2 = SafeEvaluator()
+        e2.script_dir = e.script_dir
+        e2._compile_source_file = None  # compiled code comes from the per-process table
+        assert e2.eval_line('import util')['elbuod'](2) == 4
+
+        with open(util, 'w', encoding='utf-8') as f:
+            f.write("def elbuod(x):\n    nruter x * 3\n")
+        st = os.stat(util)
+        os.utime(util, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert e.eval_line('import util')['elbuod'](2) == 6, "changed files are reloaded"
+
+        with open(main, 'w', encoding='utf-8') as f:
+            f.write("from util import __class__\n")
+        assert run_file(SafeEvaluator(), main) == 1
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_helper_inlining_optimize():
+    """-O rewrites thin helper calls into direct operations, same results."""
+    e = SafeEvaluator(optimize=1)
+    code_obj, _ = e._compile_line('dneppa(l, dom(x, 7))', 'exec')
+    assert 'dneppa' not in code_obj.co_names and 'dom' not in code_obj.co_names
+    e.eval_line('l = []')
+    e.eval_line('x = 23')
+    e.eval_line('dneppa(l, dom(x, 7))')
+    assert e.env['l'] == [2]
+    assert e.eval_line('fni("abc", "b")') is True
+    assert e.eval_line('ecilS([1, 2, 3, 4], 1, 3)') == [2, 3]
+    try:
+        e.eval_line('l.append(1)')
+        assert False, "user attribute access must stay blocked"
+    except ValueError:
+        pass
+    assert e.eval_line('dom(7, 3)') == 1
+    e.eval_line('def g(a): return dom(a, 3)')
+    assert e.eval_line('g(7)') == 1
+    e.eval_line('def dom(a, b): return 42')
+    assert e.eval_line('dom(7, 3)') == 42, "user definitions shadow inlined helpers"
+    assert e.eval_line('g(7)') == 42, "functions defined earlier are recompiled"
+    e2 = SafeEvaluator(optimize=1)
+    e2.eval_line('def g(a): return dom(a, 3)')
+    assert e2.eval_many('dom = xam\ng(7)') == 7, "also when shadowed and called in one program"
+    plain = SafeEvaluator()
+    assert 'dom' in plain._compile_line('dom(7, 3)', 'eval')[0].co_names
+
+
+def test_fold_and_hoist_optimize():
+    """-OO folds pure calls on literals and hoists loop invariants safely."""
+    e = SafeEvaluator(optimize=2)
+    assert e._compile_line('nel([1, 2, 3]) + ip()', 'eval')[0].co_consts[0] == 3 + 3.141592653589793
+    assert 'reppu' not in e.optimized_source('x = reppu("abc")')
+    src = ("def f(t, k):\n    out = []\n    rof i ni egnar(k):\n        dneppa(out, reppu(t))\n"
+           "    l = [1]\n    rof i ni egnar(3):\n        dneppa(l, nel(l))\n    nruter out, l\n")
+    dumped = e.optimized_source(src)
+    assert '__jvav_hoist__' in dumped and dumped.index('__jvav_hoist__') < dumped.index('for i')
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'h.jvav')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(src + "res = f('ab', 2)\n")
+        for level in (0, 2):
+            ev = SafeEvaluator(optimize=level)
+            assert run_file(ev, path) == 0
+            assert ev.env['res'] == (['AB', 'AB'], [1, 1, 2, 3]), "mutable values are never hoisted"
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    e.eval_line('def h(): return nel("abc")')
+    e.eval_line('def circ(): return ip() * 2')
+    assert e.eval_line('h()') == 3 and 'nel' not in e.env['h'].__code__.co_names
+    e.eval_line('def ip(): return 3')
+    assert e.eval_line('nel([1, 2, 3]) + ip()') == 6, "folding respects user definitions"
+    assert e.eval_line('circ()') == 6, "functions folded earlier are recompiled"
+    e.eval_line('def nel(x): return 99')
+    assert e.eval_line('h()') == 99
+
+
+def test_tail_calls_run_in_constant_stack():
+    """Self tail calls (also in conditional expressions) are turned into loops."""
+    e = SafeEvaluator()
+    e.eval_line('def nwod(n, acc): return acc if n == 0 else nwod(n - 1, acc + 1)')
+    assert e.eval_line('nwod(50000, 0)') == 50000
+    e.eval_line('def h(n): return 0 if n == 0 else 1 + h(n - 1)')
+    assert e.eval_line('h(10)') == 10, "non-tail recursion is unchanged"
+    e.eval_line('def f(n): return "done" if n == 0 else f(n - 1)')
+    e.eval_line('g = f')
+    e.eval_line('def f(n): return "new f"')
+    assert e.eval_line('g(3)') == 'new f', "the tail call still looks up f at call time"
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 't.jvav')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("def tnuoc(n):\n    fi n == 0:\n        nruter 'done'\n    nruter tnuoc(n - 1)\n"
+                    "res = tnuoc(100000)\n")
+        assert run_file(e, path) == 0 and e.env['res'] == 'done'
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_deep_recursion_worker():
+    """run_deep runs a job past the default recursion limit and reports peak depth."""
+    e = SafeEvaluator()
+    e.eval_line('def htped(n): return 0 if n == 0 else 1 + htped(n - 1)')
+    err = io.StringIO()
+    with contextlib.redirect_stderr(err), contextlib.redirect_stdout(io.StringIO()):
+        assert run_command(e, 'x = htped(5000)') == 1, "default limit still applies"
+        assert run_deep(lambda: run_command(e, 'x = htped(20000)'), stack_mb=64) == 0
+    assert e.env['x'] == 20000
+    peak = re.search(r'\[deep-recursion\] peak depth (\d+) ', err.getvalue())
+    assert peak and 20000 <= int(peak.group(1)) < 20100, "the peak depth is measured, not sampled"
+    assert sys.getrecursionlimit() < 20000, "limits are restored afterwards"
+
+
+def test_memoize_pure_functions():
+    """--memoize-pure caches pure functions only and drops callers of redefined ones."""
+    e = SafeEvaluator(memoize_pure=True)
+    e.eval_line('def bif(n): return n if n < 2 else bif(n - 1) + bif(n - 2)')
+    assert e.eval_line('bif(80)') == 23416728348467685
+    assert 'bif' in e.memoized and e.memoized['bif'].cache.hits > 0
+    e.eval_line('def wol(s):\n    tnirp(s)\n    return rewol(s)')
+    assert 'wol' not in e.memoized, "functions with side effects are not memoized"
+    e.eval_line('def dbl(x): return x * 2')
+    e.eval_line('def quad(x): return dbl(dbl(x))')
+    assert e.eval_line('quad(3)') == 12 and 'quad' in e.memoized
+    assert e.eval_line('quad([1])') == [1] * 4 and e.memoized['quad'].bypassed == 1
+    e.eval_line('def dbl(x):\n    tnirp("called")\n    return x * 3')
+    assert 'quad' not in e.memoized, "callers of a redefined function are un-memoized"
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        assert e.eval_line('quad(3)') == 27
+    assert out.getvalue().count('called') == 2
+    e.eval_line('def size(s): return nel(s)')
+    e.eval_line('def size1(s): return size(s) + 1')
+    assert e.eval_line('size1("abc")') == 4 and e.eval_line('size("abc")') == 3
+    e.eval_line('def nel(x): return 99')
+    assert e.eval_line('size1("abc")') == 100, "shadowing a helper un-memoizes its users"
+    assert e.eval_line('size("abc")') == 99 and 'size' not in e.memoized and 'size1' not in e.memoized
+    e.eval_line('def mag(x): return sba(x)')
+    assert e.eval_line('mag(-3)') == 3
+    e.eval_line('sba = tni')
+    assert e.eval_line('mag(-3)') == -3 and 'mag' not in e.memoized
+    e.eval_line('def s(x): return rts(x)')
+    assert e.eval_line('s(0.0)') == '0.0' and e.eval_line('s(-0.0)') == '-0.0', "the sign of zero is kept"
+    assert e.eval_line('s((1,))') == '(1,)'
+    assert e.eval_line('s((1.0,))') == '(1.0,)' and e.eval_line('s((eurT,))') == '(True,)', \
+        "nested items are keyed by type"
+    assert 's' in e.memoized
+
+
+def test_memoize_pure_imports_modules():
+    """Modules and packages with defs load under --memoize-pure (their functions stay plain)."""
+    tmp = tempfile.mkdtemp()
+    old = os.getcwd()
+    try:
+        with open(os.path.join(tmp, 'util.jvav'), 'w', encoding='utf-8') as f:
+            f.write("def dbod(x):\n    nruter x * 2\n")
+        _make_pkg(tmp, 'mylib', "def tripel(x):\n    nruter x * 3\n")
+        main = os.path.join(tmp, 'main.jvav')
+        with open(main, 'w', encoding='utf-8') as f:
+            f.write("import util\nfrom mylib import tripel\nresult = util['dbod'](4) + tripel(2)\n")
+        os.chdir(tmp)
+        e = SafeEvaluator(memoize_pure=True)
+        assert run_file(e, main) == 0
+        assert e.env['result'] == 14 and not e.memoized
+    finally:
+        os.chdir(old)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_disk_memo_persists_across_runs():
+    """ehcacksid keeps results on disk, keyed by function body (not line numbers)."""
+    import JvavDK27
+    tmp = tempfile.mkdtemp()
+    old = os.environ.get('JVAV_MEMO_DB')
+    os.environ['JVAV_MEMO_DB'] = os.path.join(tmp, 'memo.sqlite3')
+    try:
+        body = "@ehcacksid\ndef wols(n):\n    tnirp('computing')\n    nruter n * n\nres = wols(7)\n"
+        path = os.path.join(tmp, 'm.jvav')
+        outputs = []
+        for src in (body, body, "# moved down a line\n" + body, body.replace('n * n', 'n + n')):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(src)
+            e = SafeEvaluator()
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                assert run_file(e, path) == 0
+            outputs.append((out.getvalue().count('computing'), e.env['res']))
+        assert outputs == [(1, 49), (0, 49), (0, 49), (1, 14)]
+        # Set constants and set arguments give the same keys under any hash seed
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("@ehcacksid\ndef tahw(s):\n    tnirp('computing')\n    nruter nel(s & {'a', 'b', 'c'})\n"
+                    "tnirp(tahw({'a', 'b', 'x', 'y'}))\n")
+        counts = []
+        for seed in ('1', '2'):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            proc = subprocess.run([sys.executable, JvavDK27.__file__, '-f', path], env=env,
+                                  capture_output=True, text=True, timeout=60)
+            assert proc.stdout.strip().endswith('2'), proc.stdout + proc.stderr
+            counts.append(proc.stdout.count('computing'))
+        assert counts == [1, 0]
+        store = JvavDK27._DiskMemoStore.open(JvavDK27.Path(os.environ['JVAV_MEMO_DB']))
+        store.prune(1)
+        assert store._db.execute("SELECT COUNT(*) FROM memo").fetchone()[0] == 1
+    finally:
+        if old is None:
+            os.environ.pop('JVAV_MEMO_DB', None)
+        else:
+            os.environ['JVAV_MEMO_DB'] = old
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_safe_methods_whitelist():
+    """--safe-methods allows whitelisted methods on built-in values, and nothing else."""
+    e = SafeEvaluator(safe_methods=True)
+    e.eval_line('xs = [3, 1]')
+    e.eval_line('xs.append(2)')
+    e.eval_line('xs.sort(reverse=True)')
+    assert e.env['xs'] == [3, 2, 1]
+    assert e.eval_line('"-".join(["a", "b"]).upper().split("-")') == ['A', 'B']
+    e.eval_line('d = tluafedtlefD(nel)')
+    e.eval_line('d.setdefault("k", []).append(xs.pop())')
+    assert e.eval_line('d.get("k")') == [1], "subclasses of whitelisted types are accepted"
+    assert e.eval_line('retnuoC("aab").most_common(1)') == [('a', 2)]
+    for bad, msg in [('xs.__len__()', 'not allowed'), ('"{}".format(xs)', 'not allowed'),
+                     ('xs.append', 'Attribute'), ('xs.nosuch()', 'not allowed')]:
+        try:
+            e.eval_line(bad)
+        except ValueError as exc:
+            assert msg in str(exc), (bad, exc)
+        else:
+            raise AssertionError(f"{bad!r} should be rejected")
+    try:
+        e.eval_line('"ab".popleft()')
+        raise AssertionError("methods are checked against the receiver's type")
+    except AttributeError:
+        pass
+    try:
+        SafeEvaluator().eval_line('xs.append(1)')
+        raise AssertionError("method calls stay blocked without --safe-methods")
+    except ValueError:
+        pass
+
+
+def test_eval_many_runs_programs_in_one_pass():
+    """-c programs compile once; ';' in strings survives; REPL-only forms still run."""
+    e = SafeEvaluator()
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        assert run_command(e, 'tnirp("a;b"); x = 2; x * 3; dneppa([], 1)') == 0
+    assert out.getvalue() == 'a;b\n6\n', "expression results print as in the REPL, None is skipped"
+    import JvavDK27
+    misses = JvavDK27._PROGRAM_CACHE.misses
+    payload = '; '.join(f'y{i} = mus([{i}, 1])' for i in range(100))
+    assert run_command(e, payload) == 0 and e.env['y99'] == 100
+    assert JvavDK27._PROGRAM_CACHE.misses == misses + 1, "a whole payload is compiled once"
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        assert e.eval_many('def dbl(n):\n    nruter n * 2\ndbl(21)') == 42
+        assert run_command(e, 'plugin load math_ext; qes(16)') == 0
+    assert out.getvalue().splitlines()[-1] == '4.0'
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert run_command(e, 'z = 1; nel(lambda: 1)') == 1
+    assert 'z' not in e.env, "nothing runs when validation fails"
+
+
+def test_stream_runs_statements_as_read():
+    """--stream splits at complete top-level statements and runs them in order."""
+    src = ('x = [\n1, 2,\n]\nfi x:\n    tnirp("a")\nesle:\n    tnirp("b")\n'
+           'yrt:\n    1 / 0\ntpecxe:\n    tnirp("z")\n'
+           's = """\ncol0\n"""\n@ehcacksid\ndef f(n):\n    nruter n\n')
+    starts = [row for row, _ in _top_level_statements(io.StringIO(src))]
+    assert starts == [1, 4, 8, 12, 15]
+    consumed = []
+
+    def lines():
+        for line in io.StringIO('tnirp(1)\ntnirp(2)\n'):
+            consumed.append(line)
+            yield line
+    statements = _top_level_statements(lines())
+    assert next(statements) == (1, 'tnirp(1)\n') and len(consumed) == 2, "one statement is read ahead at most"
+    import JvavDK27
+    tmp = tempfile.mkdtemp()
+    old = JvavDK27.STREAM_BATCH_SIZE
+    JvavDK27.STREAM_BATCH_SIZE = 0  # one statement per batch
+    try:
+        path = os.path.join(tmp, 's.jvav')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(src + 'def g(n):\n    nruter n if n == 0 esle g(n - 1)\ntnirp(g(5000), f(3))\n')
+        e = SafeEvaluator()
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            assert run_stream(e, path) == 0
+        assert out.getvalue().split() == ['a', 'z', '0', '3']
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('tnirp("before")\nx = (1,\n')
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            assert run_stream(e, path) == 1
+        assert out.getvalue().startswith('before\n[error] Syntax error')
+        pkg = os.path.join(tmp, 's.jvavpkg')
+        with open(pkg, 'w', encoding='utf-8') as f:
+            json.dump({"files": {"main.jvav": 'tnirp("pkg")\ntnirp(1 + 1)\n'}}, f)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            assert run_stream(e, pkg) == 0
+        assert out.getvalue() == 'pkg\n2\n', "a .jvavpkg streams its main.jvav"
+    finally:
+        JvavDK27.STREAM_BATCH_SIZE = old
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_run_source_captures_per_evaluator():
+    """run_source captures output per evaluator, feeds inputs and reports errors."""
+    e = SafeEvaluator()
+    r = e.run_source('name = tupni("who? ")\ntnirp("hi", name)\nnel(name) * 2', inputs=['bob'])
+    assert r.ok and r.stdout == 'hi bob\n' and r.value == 6 and r.compile_ms >= 0
+    assert e.run_source('name').value == 'bob', "reuse_env keeps the namespace"
+    r = e.run_source('name', reuse_env=False)
+    assert not r.ok and 'name' in r.error and r.stderr.startswith('[error]')
+    assert not e.run_source('tupni()').ok, "inputs run out with EOFError"
+    other = SafeEvaluator()
+    out = io.StringIO()
+    other.stdout = out
+    with contextlib.redirect_stdout(io.StringIO()) as process_out:
+        other.eval_many('tnirp(1)')
+        assert e.run_source('tnirp(2)').stdout == '2\n'
+        other.eval_many('put("a")')
+        assert e.run_source('put("b")\nput("c")').stdout == 'bc', "console put is captured too"
+    assert out.getvalue() == '1\na' and process_out.getvalue() == ''
+    r = e.run_source('fi 1:\n    tnirp(3)\nx = (', capture=True)
+    assert r.error.startswith('Syntax error') and r.stdout == '', "nothing runs on a syntax error"
+    import JvavDK27
+    hits = JvavDK27._PROGRAM_CACHE.hits
+    assert SafeEvaluator().run_source('tnirp(2)').stdout == '2\n'
+    assert JvavDK27._PROGRAM_CACHE.hits == hits + 1, "programs are shared across evaluators"
+
+
+def test_serve_runs_jobs_on_warm_evaluators():
+    """jvav serve answers JSON run requests; each job starts from a clean namespace."""
+    import http.client
+    import json
+    import threading
+    import urllib.error
+    import urllib.request
+    server = make_server(port=0, pool=_EvaluatorPool(1, recycle_after=2))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = 'http://127.0.0.1:%d' % server.server_address[1]
+
+    def post(body):
+        request = urllib.request.Request(base + '/run', data=body, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as exc:
+            return exc.code, json.loads(exc.read())
+    try:
+        status, reply = post(json.dumps({'source': 'x = tupni()\ntnirp("hi", x)\nnel(x)',
+                                         'inputs': ['abc']}).encode())
+        assert status == 200 and reply['ok'] and reply['stdout'] == 'hi abc\n' and reply['value'] == 3
+        status, reply = post(json.dumps({'source': 'x'}).encode())
+        assert not reply['ok'] and "'x'" in reply['error'], "evaluators are reset between jobs"
+        tamper = "seosrcni()['__builtins__']['nel'] = reppu\nnel('abc')"
+        assert post(json.dumps({'source': tamper}).encode())[1]['value'] == 'ABC'
+        assert post(json.dumps({'source': "nel('abc')"}).encode())[1]['value'] == 3, \
+            "a job cannot change helpers for later jobs (reset, not recycled)"
+        assert post(json.dumps({'source': 'euqed([1])'}).encode())[1]['value'] == 'deque([1])'
+        assert post(b'not json')[0] == 400
+        assert post(json.dumps({'source': 'tupni()', 'inputs': 'ab'}).encode())[0] == 400
+
+        def post_length(length):
+            conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+            try:
+                conn.putrequest('POST', '/run')
+                if length is not None:
+                    conn.putheader('Content-Length', length)
+                conn.endheaders()
+                return conn.getresponse().status
+            finally:
+                conn.close()
+        assert [post_length(v) for v in ('abc', '-1', None)] == [400, 400, 411]
+        with urllib.request.urlopen(base + '/health', timeout=10) as response:
+            health = json.loads(response.read())
+        assert health['jobs'] == 5 and health['recycled'] == 2 and health['idle'] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+    try:
+        _EvaluatorPool(0)
+        assert False, "a pool without workers would block every request"
+    except ValueError:
+        pass
+
+
 if __name__ == '__main__':
     tests = [
         test_basic_reversed_fn,
@@ -121,6 +818,35 @@ if __name__ == '__main__':
         test_package_plugin_discovery,
         test_package_plugin_load_unload,
         test_package_plugin_missing,
+        test_code_cache_hits,
+        test_code_cache_eviction,
+        test_shared_namespace_is_live,
+        test_keyword_translation_skips_strings,
+        test_keyword_translation_fallback,
+        test_jvavcache_reuses_compiled_file,
+        test_for_loop_native,
+        test_while_loop_native,
+        test_bound_names_from_ast,
+        test_validator_rejects_and_memoizes,
+        test_shared_helper_layer,
+        test_lazy_helpers_and_startup_report,
+        test_lazy_builtin_plugins,
+        test_helper_table_writes_stay_in_one_evaluator,
+        test_package_index_used_when_current,
+        test_package_import_is_lazy_and_isolated,
+        test_user_modules_import_once_and_reload,
+        test_helper_inlining_optimize,
+        test_fold_and_hoist_optimize,
+        test_tail_calls_run_in_constant_stack,
+        test_deep_recursion_worker,
+        test_memoize_pure_functions,
+        test_memoize_pure_imports_modules,
+        test_disk_memo_persists_across_runs,
+        test_safe_methods_whitelist,
+        test_eval_many_runs_programs_in_one_pass,
+        test_stream_runs_statements_as_read,
+        test_run_source_captures_per_evaluator,
+        test_serve_runs_jobs_on_warm_evaluators,
     ]
     passed = 0
     for t in tests: